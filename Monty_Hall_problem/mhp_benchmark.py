@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Benchmark simulátorů Monty Hallova problému, výsledky jsou v ns na jeden pokus (ns/trial).
+
+Enginy (celá simulace všech strategií):
+    python        - mhp_simulator.simulate_python (3 dveře, cyklus v Pythonu)
+    numpy         - mhp_simulator.simulate_numpy (3 dveře, dávky NumPy)
+    multiprocess  - mhp_parallel.simulate_parallel (3 dveře, dávky NumPy v procesech)
+    strategies_python - mhp_strategies.simulate_python (N dveří, zásuvné strategie pokus po pokusu)
+    strategies_numpy  - mhp_generalized.simulate (N dveří, zásuvné strategie po dávkách)
+
+Strategie: hry (auto, první volba, otevřené dveře) se vygenerují jednou (řádek "draws")
+a čas každé strategie se měří na stejných hrách, pro python i numpy.
+'''
+
+import os
+import sys
+import random
+import argparse
+from time import perf_counter
+import numpy as np
+
+# root of repository in your filesystem
+THIS_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(THIS_FILE_DIR)
+
+from mhp_simulator import simulate_python, simulate_numpy
+from mhp_parallel import simulate_parallel, get_available_cpus
+from mhp_generalized import simulate, draw_games
+from mhp_strategies import STRATEGIES, get_strategies, draw_game_python
+import mhp_strategies
+
+ENGINES = ['python', 'numpy', 'multiprocess', 'strategies_python', 'strategies_numpy']
+# python je o dva řády pomalejší, dostane menší počet pokusů
+PYTHON_TRIALS_RATIO = 0.01
+
+
+def best_time(fn, repeat: int) -> float:
+    '''
+    Nejkratší čas z repeat volání fn() v sekundách
+    '''
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        fn()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def get_engine_calls(doors: int, opened: int, strategies: dict, trials: int, workers: int, seed: int) -> dict:
+    '''
+    engine => (počet pokusů, funkce bez parametrů)
+    '''
+    python_trials = max(1, int(trials * PYTHON_TRIALS_RATIO))
+    calls = {}
+    if doors == 3 and opened == 1:
+        calls['python'] = (python_trials, lambda: simulate_python(python_trials, seed=seed))
+        calls['numpy'] = (trials, lambda: simulate_numpy(trials, seed=seed))
+        calls['multiprocess'] = (trials, lambda: simulate_parallel(trials, workers, seed=seed))
+    calls['strategies_python'] = (
+        python_trials, lambda: mhp_strategies.simulate_python(doors, opened, strategies, python_trials, seed=seed)
+    )
+    calls['strategies_numpy'] = (
+        trials, lambda: simulate(doors, opened, strategies, seed=seed, max_trials=trials)
+    )
+    return calls
+
+
+def benchmark_engines(
+        doors: int, opened: int, strategies: dict, trials: int, workers: int, seed: int, repeat: int, engines: list
+) -> list:
+    rows = []
+    for engine, (engine_trials, fn) in get_engine_calls(doors, opened, strategies, trials, workers, seed).items():
+        if engine not in engines:
+            continue
+        seconds = best_time(fn, repeat)
+        rows.append({'engine': engine, 'trials': engine_trials, 'seconds': seconds})
+    return rows
+
+
+def benchmark_strategies_numpy(doors: int, opened: int, strategies: dict, trials: int, seed: int, repeat: int) -> list:
+    rng = np.random.default_rng(seed)
+    games = [None]
+
+    def draw():
+        games[0] = draw_games(rng, trials, doors, opened)
+
+    rows = [{'engine': 'numpy', 'strategy': 'draws', 'trials': trials, 'seconds': best_time(draw, repeat)}]
+    door_with_car, first_choice, opened_mask = games[0]
+    for name, strategy in strategies.items():
+        seconds = best_time(
+            lambda: np.count_nonzero(strategy.choose_batch(first_choice, opened_mask, rng) == door_with_car), repeat
+        )
+        rows.append({'engine': 'numpy', 'strategy': name, 'trials': trials, 'seconds': seconds})
+    return rows
+
+
+def benchmark_strategies_python(doors: int, opened: int, strategies: dict, trials: int, seed: int, repeat: int) -> list:
+    rng = random.Random(seed)
+    games = [None]
+
+    def draw():
+        games[0] = [draw_game_python(rng, doors, opened) for _ in range(trials)]
+
+    rows = [{'engine': 'python', 'strategy': 'draws', 'trials': trials, 'seconds': best_time(draw, repeat)}]
+    for name, strategy in strategies.items():
+        choose = strategy.choose
+
+        def play():
+            wins = 0
+            for door_with_car, first_choice, unopened in games[0]:
+                if choose(first_choice, unopened, rng) == door_with_car:
+                    wins += 1
+            return wins
+
+        rows.append({'engine': 'python', 'strategy': name, 'trials': trials, 'seconds': best_time(play, repeat)})
+    return rows
+
+
+def print_rows(rows: list, key_columns: list):
+    print(''.join('{:>20}'.format(c) for c in key_columns) + '{:>12}{:>12}{:>16}'.format('trials', 'ns/trial', 'trials/s'))
+    for row in rows:
+        print(''.join('{:>20}'.format(row[c]) for c in key_columns) + '{:>12}{:>12.1f}{:>16.0f}'.format(
+            row['trials'], 1e9 * row['seconds'] / row['trials'], row['trials'] / row['seconds']
+        ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__description__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    default = 3
+    parser.add_argument(
+        '-d', '--doors',
+        dest='doors',
+        metavar='<doors>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of doors (default:' + str(default) + ', engines python, numpy and multiprocess need 3 doors)'
+    )
+
+    default = 1
+    parser.add_argument(
+        '-k', '--opened',
+        dest='opened',
+        metavar='<opened>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of doors with a goat opened by the host (default:' + str(default) + ')'
+    )
+
+    default = 10000000
+    parser.add_argument(
+        '-n', '--trials',
+        dest='trials',
+        metavar='<trials>',
+        type=lambda value: int(float(value)),
+        required=False,
+        default=default,
+        help='count of experiments of numpy engines, python engines get ' + str(PYTHON_TRIALS_RATIO) +
+             ' of it (default:' + str(default) + ')'
+    )
+
+    default = 3
+    parser.add_argument(
+        '-r', '--repeat',
+        dest='repeat',
+        metavar='<repeat>',
+        type=int,
+        required=False,
+        default=default,
+        help='every measurement is repeated, the best time is used (default:' + str(default) + ')'
+    )
+
+    default = get_available_cpus()
+    parser.add_argument(
+        '-w', '--workers',
+        dest='workers',
+        metavar='<workers>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of processes of the multiprocess engine (default:' + str(default) + ')'
+    )
+
+    parser.add_argument(
+        '-e', '--engines',
+        dest='engines',
+        nargs='+',
+        choices=ENGINES,
+        required=False,
+        default=ENGINES,
+        help='measured engines (default: all)'
+    )
+
+    parser.add_argument(
+        '-st', '--strategies',
+        dest='strategies',
+        nargs='+',
+        choices=list(STRATEGIES),
+        required=False,
+        default=list(STRATEGIES),
+        help='measured strategies (default: all)'
+    )
+
+    default = 1
+    parser.add_argument(
+        '-s', '--seed',
+        dest='seed',
+        metavar='<seed>',
+        type=int,
+        required=False,
+        default=default,
+        help='seed of random generators (default:' + str(default) + ')'
+    )
+
+    args = parser.parse_args()
+    strategies = get_strategies(args.strategies)
+    # dávky strategií se měří najednou, omezíme je kvůli paměti (pokus x dveře)
+    batch_trials = min(args.trials, 1000000)
+    python_trials = max(1, int(batch_trials * PYTHON_TRIALS_RATIO))
+
+    print('Doors: {}, opened by the host: {}, strategies: {}'.format(args.doors, args.opened, list(strategies)))
+    print()
+    print('Engines (all strategies):')
+    print_rows(benchmark_engines(
+        args.doors, args.opened, strategies, args.trials, args.workers, args.seed, args.repeat, args.engines
+    ), ['engine'])
+    print()
+    print('Strategies (the same draws for all strategies):')
+    print_rows(
+        benchmark_strategies_python(args.doors, args.opened, strategies, python_trials, args.seed, args.repeat) +
+        benchmark_strategies_numpy(args.doors, args.opened, strategies, batch_trials, args.seed, args.repeat),
+        ['engine', 'strategy']
+    )
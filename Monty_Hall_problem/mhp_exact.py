@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Přesné pravděpodobnosti výhry (zlomky) pro zobecněný Monty Hallův problém:
+    - N dveří,
+    - více kol otevírání (v kole r moderátor otevře K_r dveří s kozou, které hráč právě nemá vybrané),
+      po každém kole se hráč rozhoduje podle své strategie,
+    - zaujatý moderátor (bias): dveře d otevře s vahou bias^d (bias = 1 je poctivý moderátor).
+
+Dva řešiče:
+    markov - stačí stav "hráč má vybrané auto" a počet neotevřených dveří, výpočet je O(počet kol)
+             (milisekundy i pro tisíce dveří). Platí i pro zaujatého moderátora: strategie volí rovnoměrně
+             mezi neotevřenými dveřmi (nezávisle na jejich čísle) a moderátor nikdy neotevře auto ani vybrané dveře,
+             takže to, které dveře otevře, nemění ani počet neotevřených dveří, ani pravděpodobnost, že hráč má
+             vybrané auto (auto je jinak rovnoměrně za ostatními neotevřenými dveřmi z pohledu strategie).
+    tree   - prochází celý strom hry (auto, volba hráče, otevřené dveře) s memoizací přes podmnožiny dveří,
+             je exponenciální v počtu dveří, slouží jen jako nezávislá kontrola markov pro malé hry
+             (nejvýše TREE_MAX_DOORS dveří)
+
+Strategie jsou stejné jako v mhp_simulator.py a mhp_generalized.py (stay, random_change, switch),
+navíc stay_then_switch (zůstává, změní až po posledním kole).
+
+S --validate se výsledky simulátorů (python, numpy, parallel, generalized) porovnají s přesnými hodnotami.
+'''
+
+import os
+import sys
+import math
+import argparse
+from fractions import Fraction
+from functools import lru_cache
+from time import perf_counter
+
+# root of repository in your filesystem
+THIS_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(THIS_FILE_DIR)
+
+STRATEGY_NAMES = ['stay', 'random_change', 'switch', 'stay_then_switch']
+# tree prochází podmnožiny dveří (8 dveří a 3 kola se zaujatým moderátorem ~ 1 s, 12 dveří desítky sekund)
+TREE_MAX_DOORS = 8
+# simulace se odchyluje od přesné hodnoty víc než Z_LIMIT směrodatných odchylek => chyba (falešný poplach ~ 6e-5)
+Z_LIMIT = 4.0
+
+
+def check_game(doors: int, rounds: tuple, strategy: str = None):
+    if doors < 2:
+        raise ValueError('at least 2 doors are needed, not {}'.format(doors))
+    if any(opened < 0 for opened in rounds) or sum(rounds) > doors - 2:
+        raise ValueError('the host can open 0 .. {} doors (of {}) in all rounds, not {}'.format(
+            doors - 2, doors, list(rounds)
+        ))
+    if strategy is not None and strategy not in STRATEGY_NAMES:
+        raise ValueError('unknown strategy "{}", use some of {}'.format(strategy, STRATEGY_NAMES))
+
+
+def _changes(strategy: str, last_round: bool) -> str:
+    '''
+    Co hráč udělá po kole: stay, random_change nebo switch
+    '''
+    if strategy == 'stay_then_switch':
+        return 'switch' if last_round else 'stay'
+    return strategy
+
+
+def solve_markov(doors: int, rounds: tuple, strategy: str) -> Fraction:
+    '''
+    Pravděpodobnost výhry s poctivým i zaujatým moderátorem (bias na výsledek strategií nemá vliv)
+    '''
+    check_game(doors, rounds, strategy)
+    guessed = Fraction(1, doors)  # pravděpodobnost, že hráč má vybrané dveře s autem
+    unopened = doors
+    for i, opened in enumerate(rounds):
+        unopened -= opened
+        change = _changes(strategy, i == len(rounds) - 1)
+        if change == 'random_change':
+            # auto je za jedněmi z neotevřených dveří (za vybranými nebo rovnoměrně za ostatními)
+            guessed = Fraction(1, unopened)
+        elif change == 'switch':
+            guessed = (1 - guessed) / (unopened - 1)
+    return guessed
+
+
+def solve_tree(doors: int, rounds: tuple, strategy: str, bias=1) -> Fraction:
+    '''
+    Pravděpodobnost výhry, moderátor otevírá dveře postupně, dveře d vybere s vahou bias^d,
+    jen pro doors <= TREE_MAX_DOORS (čas roste exponenciálně s počtem dveří)
+    '''
+    check_game(doors, rounds, strategy)
+    if doors > TREE_MAX_DOORS:
+        raise ValueError('tree solver is exponential in count of doors, it is limited to {} doors, not {} '
+                         '(use markov)'.format(TREE_MAX_DOORS, doors))
+    rounds = tuple(rounds)
+    weights = [Fraction(bias) ** d for d in range(doors)]
+    all_doors = frozenset(range(doors))
+
+    @lru_cache(maxsize=None)
+    def host_openings(eligible: frozenset, count: int) -> tuple:
+        # ((otevřené dveře, pravděpodobnost), ...)
+        if count == 0:
+            return ((frozenset(), Fraction(1)),)
+        total_weight = sum(weights[d] for d in eligible)
+        openings = {}
+        for d in eligible:
+            p = weights[d] / total_weight
+            for rest, q in host_openings(eligible - {d}, count - 1):
+                opened = rest | {d}
+                openings[opened] = openings.get(opened, 0) + p * q
+        return tuple(openings.items())
+
+    @lru_cache(maxsize=None)
+    def choices(choice: int, unopened: frozenset, change: str) -> tuple:
+        # ((nová volba, pravděpodobnost), ...)
+        if change == 'stay':
+            return ((choice, Fraction(1)),)
+        candidates = unopened if change == 'random_change' else unopened - {choice}
+        return tuple((d, Fraction(1, len(candidates))) for d in sorted(candidates))
+
+    @lru_cache(maxsize=None)
+    def play(car: int, choice: int, opened: frozenset, round_index: int) -> Fraction:
+        if round_index == len(rounds):
+            return Fraction(int(choice == car))
+        change = _changes(strategy, round_index == len(rounds) - 1)
+        eligible = all_doors - opened - {car, choice}
+        probability = Fraction(0)
+        for new_opened, p in host_openings(eligible, rounds[round_index]):
+            now_opened = opened | new_opened
+            for new_choice, q in choices(choice, all_doors - now_opened, change):
+                probability += p * q * play(car, new_choice, now_opened, round_index + 1)
+        return probability
+
+    return sum(
+        (play(car, first_choice, frozenset(), 0) for car in range(doors) for first_choice in range(doors)),
+        Fraction(0)
+    ) / (doors * doors)
+
+
+def solve(doors: int = 3, rounds: tuple = (1,), strategies: list = None, bias=1, method: str = 'markov') -> dict:
+    '''
+    strategie => přesná pravděpodobnost výhry (Fraction),
+    method je markov (pro libovolný bias, viz popis modulu) nebo tree (kontrola pro nejvýše TREE_MAX_DOORS dveří)
+    '''
+    strategies = STRATEGY_NAMES if strategies is None else strategies
+    if method == 'markov':
+        return {name: solve_markov(doors, tuple(rounds), name) for name in strategies}
+    return {name: solve_tree(doors, tuple(rounds), name, bias) for name in strategies}
+
+
+def z_score(wins: int, trials: int, probability: Fraction) -> float:
+    '''
+    Odchylka počtu výher od očekávaného počtu v násobcích směrodatné odchylky (binomické rozdělení)
+    '''
+    p = float(probability)
+    variance = trials * p * (1 - p)
+    if variance == 0:
+        return 0.0 if wins == trials * p else math.inf
+    return (wins - trials * p) / math.sqrt(variance)
+
+
+def cross_validate(wins: dict, trials: int, exact: dict) -> dict:
+    '''
+    strategie => (z-score, True pokud výsledek simulace odpovídá přesné hodnotě)
+    '''
+    return {
+        name: (z, abs(z) <= Z_LIMIT) for name, z in (
+            (name, z_score(count, trials, exact[name])) for name, count in wins.items() if name in exact
+        )
+    }
+
+
+def simulate_engines(doors: int, opened: int, trials: int, seed=None) -> dict:
+    '''
+    engine => (počet pokusů, {strategie: počet výher}) pro simulátory, které umí danou hru
+    '''
+    import mhp_generalized
+    engines = {}
+    if doors == 3 and opened == 1:
+        from mhp_simulator import simulate_python, simulate_numpy
+        from mhp_parallel import simulate_parallel
+        names = ['stay', 'random_change', 'switch']
+        # python je pomalý, stačí mu menší počet pokusů
+        python_trials = min(trials, 100000)
+        engines['python'] = (python_trials, dict(zip(names, simulate_python(python_trials, seed=seed))))
+        engines['numpy'] = (trials, dict(zip(names, simulate_numpy(trials, seed=seed))))
+        engines['parallel'] = (trials, dict(zip(names, simulate_parallel(trials, seed=seed))))
+    results = mhp_generalized.simulate(doors, opened, seed=seed, max_trials=trials)
+    engines['generalized'] = (trials, {name: s['wins'] for name, s in results['strategies'].items()})
+    return engines
+
+
+def print_exact(exact: dict, doors: int, rounds: list, bias, seconds: float):
+    print('Doors: {}, opened by the host in rounds: {}, bias of the host: {}'.format(doors, list(rounds), bias))
+    for name, probability in exact.items():
+        print('{:>17}: {} = {:.12f}'.format(name, probability, float(probability)))
+    print('Time: {:.3f} ms'.format(seconds * 1000))
+
+
+def print_validation(engines: dict, exact: dict) -> bool:
+    ok = True
+    for engine, (trials, wins) in engines.items():
+        for name, (z, valid) in cross_validate(wins, trials, exact).items():
+            ok = ok and valid
+            print('{:>12} {:>17}: {:.6f} (exact {:.6f}), z = {:+.2f} {}'.format(
+                engine, name, wins[name] / trials, float(exact[name]), z, 'OK' if valid else 'FAILED'
+            ))
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__description__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    default = 3
+    parser.add_argument(
+        '-d', '--doors',
+        dest='doors',
+        metavar='<doors>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of doors (default:' + str(default) + ')'
+    )
+
+    default = [1]
+    parser.add_argument(
+        '-k', '--opened',
+        dest='rounds',
+        metavar='<opened>',
+        type=int,
+        nargs='+',
+        required=False,
+        default=default,
+        help='count of doors opened by the host in every round, e.g. "-k 1 1 1" for 3 rounds (default:' +
+             str(default) + ')'
+    )
+
+    default = '1'
+    parser.add_argument(
+        '-bi', '--bias',
+        dest='bias',
+        metavar='<bias>',
+        type=Fraction,
+        required=False,
+        default=default,
+        help='the host opens door d (0, 1, ...) with weight bias^d, 1 is an unbiased host (default:' + default + ')'
+    )
+
+    parser.add_argument(
+        '-st', '--strategies',
+        dest='strategies',
+        nargs='+',
+        choices=STRATEGY_NAMES,
+        required=False,
+        default=STRATEGY_NAMES,
+        help='strategies (default: all)'
+    )
+
+    default = 'markov'
+    parser.add_argument(
+        '-m', '--method',
+        dest='method',
+        choices=['markov', 'tree'],
+        required=False,
+        default=default,
+        help='solver, markov is exact for any bias, tree is an exponential check for at most ' +
+             str(TREE_MAX_DOORS) + ' doors (default:' + default + ')'
+    )
+
+    parser.add_argument(
+        '--validate',
+        dest='validate',
+        action='store_true',
+        help='compare results of simulators with exact values (one round, unbiased host only)'
+    )
+
+    default = 1000000
+    parser.add_argument(
+        '-n', '--trials',
+        dest='trials',
+        metavar='<trials>',
+        type=lambda value: int(float(value)),
+        required=False,
+        default=default,
+        help='count of experiments of simulators for --validate (default:' + str(default) + ')'
+    )
+
+    parser.add_argument(
+        '-s', '--seed',
+        dest='seed',
+        metavar='<seed>',
+        type=int,
+        required=False,
+        default=None,
+        help='seed of simulators for --validate (default: random)'
+    )
+
+    args = parser.parse_args()
+    try:
+        check_game(args.doors, args.rounds)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.method == 'tree' and args.doors > TREE_MAX_DOORS:
+        parser.error('tree solver is limited to {} doors'.format(TREE_MAX_DOORS))
+
+    start = perf_counter()
+    exact = solve(args.doors, args.rounds, args.strategies, args.bias, args.method)
+    print_exact(exact, args.doors, args.rounds, args.bias, perf_counter() - start)
+
+    if args.validate:
+        if len(args.rounds) != 1 or args.bias != 1:
+            parser.error('--validate needs one round and an unbiased host (simulators do not support others)')
+        print()
+        if not print_validation(simulate_engines(args.doors, args.rounds[0], args.trials, args.seed), exact):
+            sys.exit(1)
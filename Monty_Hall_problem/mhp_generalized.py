@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Zobecněný Monty Hallův problém: N dveří, moderátor otevře K dveří s kozou (0 <= K <= N - 2).
+
+Pokusy se počítají po dávkách pevné velikosti (operace s poli NumPy), paměť tedy nezávisí na počtu pokusů
+(lze spustit i 10^10 pokusů). Po každé dávce jsou k dispozici průběžné podíly výher a jejich 95% intervaly
+spolehlivosti (Wilson), simulace může skončit dříve, když je dosaženo požadované přesnosti.
+
+Strategie hráče jsou v mhp_strategies.py (vlastní lze přidat dekorátorem register_strategy):
+    stay          - hráč zůstane u první volby
+    random_change - hráč vybere náhodně z neotevřených dveří (včetně své první volby)
+    switch        - hráč vybere náhodně z neotevřených dveří kromě své první volby
+                    (pro 3 dveře je to deterministická změna z mhp_simulator.py)
+    lowest_other  - hráč vybere neotevřené dveře s nejnižším číslem kromě své první volby
+'''
+
+import os
+import sys
+import math
+import argparse
+from time import perf_counter
+import numpy as np
+
+# root of repository in your filesystem
+THIS_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(THIS_FILE_DIR)
+
+from mhp_strategies import STRATEGIES, evaluate_batch
+
+Z_95 = 1.959964
+
+
+def draw_games(rng: np.random.Generator, size: int, doors: int, opened: int) -> (np.ndarray, np.ndarray, np.ndarray):
+    '''
+    Dávka size her: dveře s autem, první volba hráče a matice otevřených dveří (pokus x dveře).
+    Moderátor otevře náhodně opened dveří, za kterými není auto a které hráč nevybral.
+    '''
+    door_with_car = rng.integers(0, doors, size)
+    first_choice = rng.integers(0, doors, size)
+    opened_mask = np.zeros((size, doors), dtype=bool)
+    if opened:
+        rows = np.arange(size)
+        keys = rng.random((size, doors), dtype=np.float32)
+        keys[rows, door_with_car] = 2.0
+        keys[rows, first_choice] = 2.0
+        # opened dveří s nejmenšími klíči (klíče zakázaných dveří jsou větší než všechny ostatní)
+        opened_doors = np.argpartition(keys, opened - 1, axis=1)[:, :opened]
+        opened_mask[rows[:, None], opened_doors] = True
+    return door_with_car, first_choice, opened_mask
+
+
+def wilson_interval(wins: int, trials: int, z: float = Z_95) -> (float, float):
+    if trials == 0:
+        return 0.0, 1.0
+    rate = wins / trials
+    denominator = 1 + z * z / trials
+    center = (rate + z * z / (2 * trials)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / trials + z * z / (4 * trials * trials)) / denominator
+    return center - half_width, center + half_width
+
+
+def get_results(trials: int, wins: dict) -> dict:
+    '''
+    {'trials': počet pokusů, 'strategies': {jméno: {'wins', 'rate', 'ci_low', 'ci_high'}}}
+    '''
+    strategies = {}
+    for name, count in wins.items():
+        ci_low, ci_high = wilson_interval(count, trials)
+        strategies[name] = {
+            'wins': count, 'rate': count / trials if trials else math.nan, 'ci_low': ci_low, 'ci_high': ci_high
+        }
+    return {'trials': trials, 'strategies': strategies}
+
+
+def get_half_width(results: dict) -> float:
+    '''
+    Největší polovina šířky intervalu spolehlivosti ze všech strategií
+    '''
+    return max((s['ci_high'] - s['ci_low']) / 2 for s in results['strategies'].values())
+
+
+def check_game(doors: int, opened: int):
+    if doors < 2:
+        raise ValueError('at least 2 doors are needed, not {}'.format(doors))
+    if not 0 <= opened <= doors - 2:
+        raise ValueError('the host can open 0 .. {} doors (of {}), not {}'.format(doors - 2, doors, opened))
+
+
+def check_batch_size(batch_size: int):
+    if batch_size < 1:
+        raise ValueError('batch_size must be positive, not {}'.format(batch_size))
+
+
+def simulate_batches(
+        doors: int = 3,
+        opened: int = 1,
+        strategies: dict = None,
+        batch_size: int = 100000,
+        seed=None,
+        max_trials: int = None
+):
+    '''
+    Yield průběžné výsledky (get_results) po každé dávce batch_size pokusů, bez max_trials donekonečna.
+    strategies je slovník jméno => Strategy (default: všechny z mhp_strategies.STRATEGIES),
+    všechny strategie hrají stejné hry (stejná auta, první volby i otevřené dveře).
+    '''
+    check_game(doors, opened)
+    check_batch_size(batch_size)
+    strategies = STRATEGIES if strategies is None else strategies
+    rng = np.random.default_rng(seed)
+    wins = dict.fromkeys(strategies, 0)
+    trials = 0
+    while max_trials is None or trials < max_trials:
+        size = batch_size if max_trials is None else min(batch_size, max_trials - trials)
+        door_with_car, first_choice, opened_mask = draw_games(rng, size, doors, opened)
+        for name, count in evaluate_batch(strategies, door_with_car, first_choice, opened_mask, rng).items():
+            wins[name] += count
+        trials += size
+        yield get_results(trials, wins)
+
+
+def simulate(
+        doors: int = 3,
+        opened: int = 1,
+        strategies: dict = None,
+        batch_size: int = 100000,
+        seed=None,
+        max_trials: int = 10000000,
+        precision: float = None,
+        min_trials: int = 10000,
+        callback=None
+) -> dict:
+    '''
+    Simulace až max_trials pokusů, s precision skončí dříve, jakmile je polovina šířky intervalů spolehlivosti
+    všech strategií nejvýše precision (po alespoň min_trials pokusech).
+    callback(results) je volán po každé dávce.
+    '''
+    results = get_results(0, dict.fromkeys(STRATEGIES if strategies is None else strategies, 0))
+    for results in simulate_batches(doors, opened, strategies, batch_size, seed, max_trials):
+        if callback is not None:
+            callback(results)
+        if precision is not None and results['trials'] >= min_trials and get_half_width(results) <= precision:
+            break
+    return results
+
+
+def print_results(results: dict, doors: int, opened: int, seconds: float = None):
+    print('Doors: {}, opened by the host: {}, count of experiments: {}'.format(doors, opened, results['trials']))
+    for name, s in results['strategies'].items():
+        print('{:>15}: the player wins {} times ({:.6f} %, 95% CI {:.6f} - {:.6f} %)'.format(
+            name, s['wins'], 100 * s['rate'], 100 * s['ci_low'], 100 * s['ci_high']
+        ))
+    if seconds is not None:
+        print('Time: {:.3f} s, {:.0f} trials/s'.format(seconds, results['trials'] / seconds if seconds > 0 else math.inf))
+
+
+def print_progress(results: dict):
+    print('{:>14}\t{}'.format(results['trials'], '\t'.join(
+        '{}={:.6f}'.format(name, s['rate']) for name, s in results['strategies'].items()
+    )))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__description__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    default = 3
+    parser.add_argument(
+        '-d', '--doors',
+        dest='doors',
+        metavar='<doors>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of doors (default:' + str(default) + ')'
+    )
+
+    default = 1
+    parser.add_argument(
+        '-k', '--opened',
+        dest='opened',
+        metavar='<opened>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of doors with a goat opened by the host, at most doors - 2 (default:' + str(default) + ')'
+    )
+
+    default = 10000000
+    parser.add_argument(
+        '-n', '--max_trials',
+        dest='max_trials',
+        metavar='<max_trials>',
+        type=lambda value: int(float(value)),  # dovolí i 1e10
+        required=False,
+        default=default,
+        help='maximal count of experiments (default:' + str(default) + ')'
+    )
+
+    default = 100000
+    parser.add_argument(
+        '-b', '--batch_size',
+        dest='batch_size',
+        metavar='<batch_size>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of experiments in one batch, memory is proportional to batch_size * doors '
+             '(default:' + str(default) + ')'
+    )
+
+    parser.add_argument(
+        '-p', '--precision',
+        dest='precision',
+        metavar='<precision>',
+        type=float,
+        required=False,
+        default=None,
+        help='stop when the half width of 95%% confidence intervals of all strategies is at most precision '
+             '(for example 0.0001)'
+    )
+
+    parser.add_argument(
+        '-st', '--strategies',
+        dest='strategies',
+        nargs='+',
+        choices=list(STRATEGIES),
+        required=False,
+        default=list(STRATEGIES),
+        help='simulated strategies (default: all)'
+    )
+
+    parser.add_argument(
+        '-s', '--seed',
+        dest='seed',
+        metavar='<seed>',
+        type=int,
+        required=False,
+        default=None,
+        help='seed of the random generator (default: random)'
+    )
+
+    parser.add_argument(
+        '-v', '--verbose',
+        dest='verbose',
+        action='store_true',
+        help='print running win rates after every batch'
+    )
+
+    args = parser.parse_args()
+    try:
+        check_game(args.doors, args.opened)
+        check_batch_size(args.batch_size)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = perf_counter()
+    results = simulate(
+        args.doors, args.opened, {name: STRATEGIES[name] for name in args.strategies}, args.batch_size,
+        args.seed, args.max_trials, args.precision, callback=print_progress if args.verbose else None
+    )
+    print_results(results, args.doors, args.opened, perf_counter() - start)
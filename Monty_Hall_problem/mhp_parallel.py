@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Paralelní simulace Monty Hallova problému (3 dveře, strategie z mhp_simulator.py) v procesech.
+
+Pokusy jsou rozděleny do bloků pevné velikosti (nezávisle na počtu procesů), blok číslo i používá
+vlastní proud náhodných čísel SeedSequence(seed).spawn(...)[i]. Výsledek (součet počtů výher všech bloků)
+je proto pro daný seed bitově stejný pro libovolný počet procesů.
+
+S --scaling se simulace spustí pro 1, 2, 4, ... procesů (až do --workers) a vypíše se zrychlení,
+použitelné jako benchmark propustnosti CPU.
+'''
+
+import os
+import sys
+import argparse
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+# root of repository in your filesystem
+THIS_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(THIS_FILE_DIR)
+
+from mhp_simulator import simulate_numpy, print_results
+
+# počet bloků na jeden proces (víc bloků než procesů vyrovná zátěž)
+BLOCKS_PER_WORKER = 8
+# výchozí velikost bloku, je pevná (výsledek na ní závisí), ale dost malá, aby bloků bylo víc než jader
+# (1e8 pokusů = 100 bloků)
+BLOCK_SIZE = 1000000
+
+
+def get_available_cpus() -> int:
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+
+
+def get_block_seed(root: np.random.SeedSequence, block: int) -> np.random.SeedSequence:
+    '''
+    Stejné jako root.spawn(block + 1)[block], ale bez vytváření všech předchozích potomků
+    '''
+    return np.random.SeedSequence(root.entropy, spawn_key=root.spawn_key + (block,), pool_size=root.pool_size)
+
+
+def get_blocks(count_of_iter: int, block_size: int, root: np.random.SeedSequence, batch_size: int):
+    '''
+    Yield (seed bloku, počet pokusů bloku, batch_size)
+    '''
+    for block, start in enumerate(range(0, count_of_iter, block_size)):
+        yield get_block_seed(root, block), min(block_size, count_of_iter - start), batch_size
+
+
+def simulate_block(block: tuple) -> (int, int, int):
+    seed, size, batch_size = block
+    return simulate_numpy(size, batch_size=batch_size, seed=seed)
+
+
+def simulate_parallel(
+        count_of_iter: int,
+        workers: int = None,
+        seed=None,
+        block_size: int = BLOCK_SIZE,
+        batch_size: int = 1000000
+) -> (int, int, int):
+    '''
+    Počty výher (number_of_succes_for_nochange, ..._random_change, ..._determ_change) z workers procesů,
+    seed je int nebo numpy.random.SeedSequence.
+    Výsledek závisí na seed a block_size, ne na workers. Procesy se vytíží jen při dostatku bloků
+    (aspoň workers, pro vyrovnání zátěže workers * BLOCKS_PER_WORKER), jinak se vypíše varování.
+    '''
+    workers = workers or get_available_cpus()
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    blocks = get_blocks(count_of_iter, block_size, root, batch_size)
+    results = [0, 0, 0]
+    if workers == 1:
+        partial_results = map(simulate_block, blocks)
+        for partial in partial_results:
+            for i, wins in enumerate(partial):
+                results[i] += wins
+        return tuple(results)
+    count_of_blocks = (count_of_iter + block_size - 1) // block_size
+    if count_of_blocks < workers * BLOCKS_PER_WORKER:
+        sys.stderr.write(
+            'Warning: {} blocks for {} workers, the load is not balanced (use smaller --block_size, '
+            'at least {} blocks are needed)\n'.format(count_of_blocks, workers, workers * BLOCKS_PER_WORKER)
+        )
+    chunksize = max(1, count_of_blocks // (workers * BLOCKS_PER_WORKER))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(simulate_block, blocks, chunksize=chunksize):
+            for i, wins in enumerate(partial):
+                results[i] += wins
+    return tuple(results)
+
+
+def get_worker_counts(max_workers: int) -> list:
+    counts = [2**i for i in range(max_workers.bit_length()) if 2**i < max_workers]
+    return counts + [max_workers]
+
+
+def print_scaling(count_of_iter: int, workers: int, seed: int, block_size: int, batch_size: int):
+    '''
+    Simulace pro 1, 2, 4, ... workers procesů, výsledky musí být stejné
+    '''
+    print('{:>8} {:>10} {:>14} {:>8} {:>10}'.format('workers', 'time [s]', 'trials/s', 'speedup', 'efficiency'))
+    first = None
+    for count in get_worker_counts(workers):
+        start = perf_counter()
+        results = simulate_parallel(count_of_iter, count, seed, block_size, batch_size)
+        seconds = perf_counter() - start
+        if first is None:
+            first = (results, seconds)
+        elif results != first[0]:
+            raise RuntimeError('results for {} workers {} differ from results for 1 worker {}'.format(
+                count, results, first[0]
+            ))
+        speedup = first[1] / seconds
+        print('{:>8} {:>10.3f} {:>14.0f} {:>8.2f} {:>10.2f}'.format(
+            count, seconds, count_of_iter / seconds, speedup, speedup / count
+        ))
+    print()
+    print_results(count_of_iter, first[0])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__description__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    default = 100000000
+    parser.add_argument(
+        '-n', '--count_of_iter',
+        dest='count_of_iter',
+        metavar='<count_of_iter>',
+        type=lambda value: int(float(value)),  # dovolí i 1e10
+        required=False,
+        default=default,
+        help='count of experiments (default:' + str(default) + ')'
+    )
+
+    default = get_available_cpus()
+    parser.add_argument(
+        '-w', '--workers',
+        dest='workers',
+        metavar='<workers>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of processes (default: count of available CPUs, ' + str(default) + ')'
+    )
+
+    default = BLOCK_SIZE
+    parser.add_argument(
+        '-bs', '--block_size',
+        dest='block_size',
+        metavar='<block_size>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of experiments in one block with its own random stream, '
+             'results depend on it (not on count of workers) (default:' + str(default) + ')'
+    )
+
+    default = 1000000
+    parser.add_argument(
+        '-b', '--batch_size',
+        dest='batch_size',
+        metavar='<batch_size>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of experiments in one batch of numpy arrays (default:' + str(default) + ')'
+    )
+
+    parser.add_argument(
+        '-s', '--seed',
+        dest='seed',
+        metavar='<seed>',
+        type=int,
+        required=False,
+        default=None,
+        help='seed of the random generator (default: random, it is printed)'
+    )
+
+    parser.add_argument(
+        '--scaling',
+        dest='scaling',
+        action='store_true',
+        help='run with 1, 2, 4, ... workers, check that results are the same and print speedup'
+    )
+
+    args = parser.parse_args()
+
+    # seed je vždy vypsán, aby šlo výsledek zopakovat
+    seed = np.random.SeedSequence(args.seed).entropy
+    print('Seed: {}'.format(seed))
+    if args.scaling:
+        print_scaling(args.count_of_iter, args.workers, seed, args.block_size, args.batch_size)
+    else:
+        start = perf_counter()
+        results = simulate_parallel(args.count_of_iter, args.workers, seed, args.block_size, args.batch_size)
+        print('Workers: {}'.format(args.workers))
+        print_results(args.count_of_iter, results, perf_counter() - start)
@@ -19,67 +19,188 @@ Viz https://cs.wikipedia.org/wiki/Monty_Hall%C5%AFv_probl%C3%A9m
 Motivace: Luboš Pick - Jak napálit matfyzáka (MFF-FPF 14.12.2017), https://www.youtube.com/watch?v=tB_z17TBrNg 
 '''
 
-from random import choice
-
-count_of_iter = 100000 # počet pokusů, které provedeme
-debug = False # Chceme (při ladění) vypisovat jednotlivé experimenty?
+import argparse
+from random import Random
+from time import perf_counter
+import numpy as np
 
 doors_list = [1,2,3] # Máme troje dveře s čísly 1, 2 a 3
 doors_set = set(doors_list) # pro výpočet použijem množinu dveří
 
-number_of_succes_for_nochange = 0 # počet výher (auta) kdy při druhé volbě nedojde ke změně
-number_of_succes_for_random_change = 0 # počet výher (auta) pro náhodnou změnu dveří při druhé volbě
-number_of_succes_for_determ_change = 0 # počet výher (auta) deterministickou změnu dveří při druhé volbě
+# strategie v pořadí výsledků simulací
+STRATEGY_DESCRIPTIONS = [
+    'The player stays at the first choice.',
+    'The player changes his choice and he chooses a door randomly again.',
+    'The player changes his choice and he chooses deterministically unselected and unopened doors.',
+]
+
+
+def simulate_python(count_of_iter: int, debug: bool = False, seed=None) -> (int, int, int):
+    '''
+    Původní simulace (cyklus v Pythonu, jeden pokus po druhém),
+    vrací počty výher (number_of_succes_for_nochange, ..._random_change, ..._determ_change)
+    '''
+    choice = Random(seed).choice
+
+    number_of_succes_for_nochange = 0 # počet výher (auta) kdy při druhé volbě nedojde ke změně
+    number_of_succes_for_random_change = 0 # počet výher (auta) pro náhodnou změnu dveří při druhé volbě
+    number_of_succes_for_determ_change = 0 # počet výher (auta) deterministickou změnu dveří při druhé volbě
+
+    for i in range(0, count_of_iter):
+        door_with_car = choice(doors_list) # auto je náhodně za dveřmi číslo 1, 2 nebo 3
+        first_choice = choice(doors_list) # hráč nejprve náhodně vybere dveře číslo 1, 2 nebo 3
+
+        # Moderátor (Monty Hall) otevře náhodně zbývající dveře s kozou.
+        # Následující výpočet je v pořádku jak v případě, že v první volbě hráč dveře uhodl
+        # (number_of_door_with_car == first_choice) a vybírá se náhodně ze dvou možností (dvě kozy na výběr),
+        # tak v případě, že neuhodl a vybírá se z jedné možnosti (jedna koza na výběr).
+
+        open_door_with_goat = choice(
+            list(
+                doors_set - {door_with_car} - {first_choice}
+            )
+        )
 
-for i in range(0, count_of_iter):
-    door_with_car = choice(doors_list) # auto je náhodně za dveřmi číslo 1, 2 nebo 3
-    first_choice = choice(doors_list) # hráč nejprve náhodně vybere dveře číslo 1, 2 nebo 3
+        if debug:
+            print('#{}, car is in: {}, firt choice: {},  moderator open:{}'.format(
+                i, door_with_car, first_choice, open_door_with_goat)
+            )
+
+        # Výpočet úspěšnosti pro tři strategie
+        # 1. Hráč nemění svůj názor, setrvává u první volby.
+        if door_with_car == first_choice:
+            number_of_succes_for_nochange += 1
+
+        # 2. Hráč mění svůj názor, a vybírá náhodně z neotevřených dveří.
+        second_random_choice = choice(
+            list(
+                doors_set - {open_door_with_goat}
+            )
+        )
+        if door_with_car == second_random_choice:
+            number_of_succes_for_random_change += 1
+
+        # 3. Hráč mění svůj názor, a vybírá si detrministicky dveře,
+        # které nebyly vybrán při první volbě a nebyly otevřeny moderátorem.
+        second_determ_choice = list(
+                doors_set - {open_door_with_goat} - {first_choice}
+            )[0]
+        if door_with_car == second_determ_choice:
+            number_of_succes_for_determ_change += 1
+
+    return number_of_succes_for_nochange, number_of_succes_for_random_change, number_of_succes_for_determ_change
+
+
+def simulate_numpy_batch(rng: np.random.Generator, size: int) -> (int, int, int):
+    '''
+    Jedna dávka size pokusů najednou (operace s poli NumPy), dveře jsou 0, 1 a 2
+    '''
+    door_with_car = rng.integers(0, 3, size, dtype=np.int8)
+    first_choice = rng.integers(0, 3, size, dtype=np.int8)
+    guessed = door_with_car == first_choice
+
+    # Moderátor otevře dveře s kozou: při uhodnutí náhodně jedny ze dvou zbývajících,
+    # jinak jediné zbývající (součet čísel všech dveří je 0 + 1 + 2 = 3).
+    open_door_with_goat = np.where(
+        guessed,
+        (first_choice + rng.integers(1, 3, size, dtype=np.int8)) % 3,
+        3 - door_with_car - first_choice
+    )
+    # jediné neotevřené a nevybrané dveře
+    second_determ_choice = 3 - first_choice - open_door_with_goat
+    # náhodně ze dvou neotevřených dveří (první volba nebo ty zbývající)
+    second_random_choice = np.where(rng.integers(0, 2, size, dtype=np.int8) == 0, first_choice, second_determ_choice)
+
+    return (
+        int(np.count_nonzero(guessed)),
+        int(np.count_nonzero(door_with_car == second_random_choice)),
+        int(np.count_nonzero(door_with_car == second_determ_choice)),
+    )
 
-    # Moderátor (Monty Hall) otevře náhodně zbývající dveře s kozou.
-    # Následující výpočet je v pořádku jak v případě, že v první volbě hráč dveře uhodl
-    # (number_of_door_with_car == first_choice) a vybírá se náhodně ze dvou možností (dvě kozy na výběr),
-    # tak v případě, že neuhodl a vybírá se z jedné možnosti (jedna koza na výběr).
 
-    open_door_with_goat = choice(
-        list(
-            doors_set - {door_with_car} - {first_choice}
-        )
+def simulate_numpy(count_of_iter: int, batch_size: int = 1000000, seed=None) -> (int, int, int):
+    '''
+    Stejná simulace jako simulate_python, ale po dávkách (paměť je omezena velikostí dávky),
+    seed může být i numpy.random.SeedSequence
+    '''
+    rng = np.random.default_rng(seed)
+    results = [0, 0, 0]
+    for start in range(0, count_of_iter, batch_size):
+        for i, wins in enumerate(simulate_numpy_batch(rng, min(batch_size, count_of_iter - start))):
+            results[i] += wins
+    return tuple(results)
+
+
+def print_results(count_of_iter: int, results: tuple, seconds: float = None):
+    # výpis výsledků
+    print('Count of experiments: {}'.format(count_of_iter))
+    for i, description in enumerate(STRATEGY_DESCRIPTIONS):
+        print('{}. {}'.format(i + 1, description))
+    print()
+    for i, result in enumerate(results):
+        print('{}. The player wins {} times ({} %).'.format(i+1, result, 100 * result/count_of_iter))
+    if seconds is not None:
+        print()
+        print('Time: {:.3f} s, {:.0f} trials/s'.format(seconds, count_of_iter / seconds if seconds > 0 else float('inf')))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__description__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    default = 100000
+    parser.add_argument(
+        '-n', '--count_of_iter',
+        dest='count_of_iter',
+        metavar='<count_of_iter>',
+        type=lambda value: int(float(value)),  # dovolí i 1e7
+        required=False,
+        default=default,
+        help='count of experiments (default:' + str(default) + ')'
     )
 
-    if debug:
-        print('#{}, car is in: {}, firt choice: {},  moderator open:{}'.format(
-            i, door_with_car, first_choice, open_door_with_goat)
-        )
+    default = 'numpy'
+    parser.add_argument(
+        '-e', '--engine',
+        dest='engine',
+        choices=['python', 'numpy'],
+        required=False,
+        default=default,
+        help='python (loop, one experiment after another) or numpy (batches of experiments) (default:' + default + ')'
+    )
 
-    # Výpočet úspěšnosti pro tři strategie
-    # 1. Hráč nemění svůj názor, setrvává u první volby.
-    if door_with_car == first_choice:
-        number_of_succes_for_nochange += 1
+    default = 1000000
+    parser.add_argument(
+        '-b', '--batch_size',
+        dest='batch_size',
+        metavar='<batch_size>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of experiments in one batch of the numpy engine (default:' + str(default) + ')'
+    )
 
-    # 2. Hráč mění svůj názor, a vybírá náhodně z neotevřených dveří.
-    second_random_choice = choice(
-        list(
-            doors_set - {open_door_with_goat}
-        )
+    parser.add_argument(
+        '-s', '--seed',
+        dest='seed',
+        metavar='<seed>',
+        type=int,
+        required=False,
+        default=None,
+        help='seed of the random generator (default: random)'
     )
-    if door_with_car == second_random_choice:
-        number_of_succes_for_random_change += 1
-
-    # 3. Hráč mění svůj názor, a vybírá si detrministicky dveře,
-    # které nebyly vybrán při první volbě a nebyly otevřeny moderátorem.
-    second_determ_choice = list(
-            doors_set - {open_door_with_goat} - {first_choice}
-        )[0]
-    if door_with_car == second_determ_choice:
-        number_of_succes_for_determ_change += 1
-    
-# výpis výsledků
-print('Count of experiments: {}'.format(count_of_iter))
-print('1. The player stays at the first choice.')
-print('2. The player changes his choice and he chooses a door randomly again.')
-print('3. The player changes his choice and he chooses deterministically unselected and unopened doors.')
-print()
-results = [number_of_succes_for_nochange, number_of_succes_for_random_change, number_of_succes_for_determ_change]
-for i, result in enumerate(results):
-    print('{}. The player wins {} times ({} %).'.format(i+1, result, 100 * result/count_of_iter))
 
+    parser.add_argument(
+        '-d', '--debug',
+        dest='debug',
+        action='store_true',
+        help='print every experiment (python engine only)'
+    )
+
+    args = parser.parse_args()
+
+    start = perf_counter()
+    if args.engine == 'python':
+        results = simulate_python(args.count_of_iter, debug=args.debug, seed=args.seed)
+    else:
+        results = simulate_numpy(args.count_of_iter, batch_size=args.batch_size, seed=args.seed)
+    print_results(args.count_of_iter, results, perf_counter() - start)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Strategie hráče zobecněného Monty Hallova problému jako zásuvné moduly.
+
+Strategie je podtřída Strategy registrovaná dekorátorem register_strategy, implementuje
+    choose(first_choice, unopened, rng)        - jeden pokus (čistý Python), unopened je seznam neotevřených dveří
+    choose_batch(first_choice, opened_mask, rng) - dávka pokusů (pole NumPy), opened_mask je matice pokus x dveře
+Strategie bez choose_batch funguje také (pokus po pokusu přes choose), jen pomaleji.
+
+Všechny strategie se vyhodnocují na stejných hrách (auto, první volba, otevřené dveře),
+náhodná čísla hry se tedy generují jen jednou (evaluate_batch, simulate_python).
+'''
+
+import random
+import numpy as np
+
+# jméno => instance strategie
+STRATEGIES = {}
+
+
+def register_strategy(cls):
+    '''
+    Dekorátor třídy strategie, přidá její instanci do STRATEGIES
+    '''
+    STRATEGIES[cls.name] = cls()
+    return cls
+
+
+def random_choice_from_mask(rng: np.random.Generator, mask: np.ndarray) -> np.ndarray:
+    '''
+    Pro každý řádek matice mask (pokus x dveře) náhodně (rovnoměrně) vybere jedny dveře s hodnotou True
+    '''
+    keys = rng.random(mask.shape, dtype=np.float32)
+    keys[~mask] = 2.0
+    return keys.argmin(axis=1)
+
+
+class Strategy:
+    '''
+    Společný předek strategií, name je jméno v STRATEGIES
+    '''
+    name = None
+    description = ''
+
+    def choose(self, first_choice: int, unopened: list, rng: random.Random) -> int:
+        raise NotImplementedError
+
+    def choose_batch(self, first_choice: np.ndarray, opened_mask: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        # náhradní (pomalé) řešení pro strategie, které implementují jen choose
+        python_rng = random.Random(int(rng.integers(2**63)))
+        return np.array([
+            self.choose(int(first), np.flatnonzero(~opened).tolist(), python_rng)
+            for first, opened in zip(first_choice, opened_mask)
+        ], dtype=first_choice.dtype)
+
+
+@register_strategy
+class Stay(Strategy):
+    name = 'stay'
+    description = 'The player stays at the first choice.'
+
+    def choose(self, first_choice, unopened, rng):
+        return first_choice
+
+    def choose_batch(self, first_choice, opened_mask, rng):
+        return first_choice
+
+
+@register_strategy
+class RandomChange(Strategy):
+    name = 'random_change'
+    description = 'The player chooses randomly from unopened doors (the first choice included).'
+
+    def choose(self, first_choice, unopened, rng):
+        return rng.choice(unopened)
+
+    def choose_batch(self, first_choice, opened_mask, rng):
+        return random_choice_from_mask(rng, ~opened_mask)
+
+
+@register_strategy
+class Switch(Strategy):
+    name = 'switch'
+    description = 'The player chooses randomly from unopened doors except the first choice.'
+
+    def choose(self, first_choice, unopened, rng):
+        return rng.choice([door for door in unopened if door != first_choice])
+
+    def choose_batch(self, first_choice, opened_mask, rng):
+        allowed = ~opened_mask
+        allowed[np.arange(len(first_choice)), first_choice] = False
+        return random_choice_from_mask(rng, allowed)
+
+
+@register_strategy
+class LowestOther(Strategy):
+    name = 'lowest_other'
+    description = 'The player chooses the unopened door with the lowest number except the first choice ' \
+                  '(deterministic change of mhp_simulator.py for 3 doors).'
+
+    def choose(self, first_choice, unopened, rng):
+        return next(door for door in unopened if door != first_choice)
+
+    def choose_batch(self, first_choice, opened_mask, rng):
+        allowed = ~opened_mask
+        allowed[np.arange(len(first_choice)), first_choice] = False
+        return allowed.argmax(axis=1)
+
+
+def get_strategies(names: list = None) -> dict:
+    if names is None:
+        return dict(STRATEGIES)
+    unknown = [name for name in names if name not in STRATEGIES]
+    if unknown:
+        raise ValueError('unknown strategies {}, use some of {}'.format(unknown, list(STRATEGIES)))
+    return {name: STRATEGIES[name] for name in names}
+
+
+def evaluate_batch(
+        strategies: dict,
+        door_with_car: np.ndarray,
+        first_choice: np.ndarray,
+        opened_mask: np.ndarray,
+        rng: np.random.Generator
+) -> dict:
+    '''
+    strategie => počet výher v dávce her (všechny strategie hrají stejné hry)
+    '''
+    return {
+        name: int(np.count_nonzero(strategy.choose_batch(first_choice, opened_mask, rng) == door_with_car))
+        for name, strategy in strategies.items()
+    }
+
+
+def draw_game_python(rng: random.Random, doors: int, opened: int) -> (int, int, list):
+    '''
+    Jedna hra: dveře s autem, první volba a seznam neotevřených dveří (vzestupně)
+    '''
+    door_with_car = rng.randrange(doors)
+    first_choice = rng.randrange(doors)
+    goats = [door for door in range(doors) if door != door_with_car and door != first_choice]
+    opened_doors = set(rng.sample(goats, opened))
+    return door_with_car, first_choice, [door for door in range(doors) if door not in opened_doors]
+
+
+def simulate_python(doors: int, opened: int, strategies: dict, trials: int, seed=None) -> dict:
+    '''
+    strategie => počet výher z trials her počítaných pokus po pokusu v čistém Pythonu
+    '''
+    rng = random.Random(seed)
+    wins = dict.fromkeys(strategies, 0)
+    for _ in range(trials):
+        door_with_car, first_choice, unopened = draw_game_python(rng, doors, opened)
+        for name, strategy in strategies.items():
+            if strategy.choose(first_choice, unopened, rng) == door_with_car:
+                wins[name] += 1
+    return wins
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Testy mhp_exact.py: markov souhlasí s tree (i pro zaujatého moderátora) a je rychlý i pro tisíce dveří.
+Spuštění: python -m pytest test_mhp_exact.py (nebo python test_mhp_exact.py)
+'''
+
+import os
+import sys
+import unittest
+from fractions import Fraction
+from time import perf_counter
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mhp_exact import solve, solve_tree, STRATEGY_NAMES, TREE_MAX_DOORS
+
+
+class TestExact(unittest.TestCase):
+
+    def test_classic(self):
+        self.assertEqual(solve(3, (1,), ['stay', 'switch']), {'stay': Fraction(1, 3), 'switch': Fraction(2, 3)})
+
+    def test_markov_equals_tree(self):
+        for doors, rounds in [(3, (1,)), (4, (1, 1)), (5, (1, 2)), (6, (2, 1, 1)), (7, (1, 1, 1))]:
+            for bias in [Fraction(1), Fraction(1, 2), Fraction(3)]:
+                self.assertEqual(
+                    solve(doors, rounds, STRATEGY_NAMES, bias, method='markov'),
+                    solve(doors, rounds, STRATEGY_NAMES, bias, method='tree'),
+                    (doors, rounds, bias)
+                )
+
+    def test_markov_time(self):
+        start = perf_counter()
+        exact = solve(10000, (1000,) * 9, STRATEGY_NAMES, Fraction(1, 2))
+        self.assertLess(perf_counter() - start, 1.0)
+        self.assertEqual(exact['stay'], Fraction(1, 10000))
+
+    def test_tree_size_bound(self):
+        with self.assertRaises(ValueError):
+            solve_tree(TREE_MAX_DOORS + 1, (1,), 'switch', Fraction(1, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Single-pass parser of Question2Answer language files (<?php ... return array('key' => 'value', ...);).
+
+The array is scanned once from left to right by small anchored token patterns (no backtracking over strings),
+so the time is linear in the size of the file. It handles
+    - single and double quoted strings with escaped quotes and backslashes,
+    - concatenation of strings ('a' . "b") and values over more lines,
+    - comments //, # and /* */ (a line comment after an entry is the comment of the entry),
+    - numbers and constants as values (they are not translatable, quote of such entry is None).
+Text which is not understood is skipped to the end of its line and reported as an unparsed span
+(start, end, text), nothing is dropped silently.
+
+Run it with files to see their unparsed spans, or with --benchmark to compare it with the former regular expression
+on large synthetic language files.
+'''
+import re
+import sys
+import argparse
+import random
+from collections import namedtuple
+from time import perf_counter
+
+# raw - content of the string between quotes as in the source (escapes are kept),
+# value - the string as PHP understands it (escapes decoded), start, end - span of the entry with its comment
+Entry = namedtuple('Entry', ['key', 'value', 'raw', 'quote', 'comment', 'start', 'end'])
+Span = namedtuple('Span', ['start', 'end', 'text'])
+
+ARRAY_START_RE = re.compile(r'return\s+array\s*\(|return\s*\[')
+WHITESPACE_RE = re.compile(r'\s+')
+INLINE_WHITESPACE_RE = re.compile(r'[^\S\n]*')
+LINE_COMMENT_RE = re.compile(r'(?://|#)(?P<comment>[^\n]*)')
+BLOCK_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+# alternatives of the loops are disjoint, every character is matched only once
+SINGLE_QUOTED_RE = re.compile(r"'(?P<raw>[^'\\]*(?:\\.[^'\\]*)*)'", re.DOTALL)
+DOUBLE_QUOTED_RE = re.compile(r'"(?P<raw>[^"\\]*(?:\\.[^"\\]*)*)"', re.DOTALL)
+SCALAR_RE = re.compile(r'-?(?:0x[0-9a-fA-F]+|\d+(?:\.\d+)?)|true|false|null|[A-Z_][A-Z0-9_]*', re.IGNORECASE)
+ARROW_RE = re.compile(r'\s*=>\s*')
+DOT_RE = re.compile(r'\s*\.\s*')
+TO_LINE_END_RE = re.compile(r'[^\n]*')
+TAIL_RE = re.compile(r'\s*[)\]]\s*;')
+# the most common entry ('key' => 'value', // comment) is matched at once, others token by token
+SIMPLE_ENTRY_RE = re.compile(
+    r"'(?P<key>[^'\\]*(?:\\.[^'\\]*)*)'[^\S\n]*=>[^\S\n]*'(?P<raw>[^'\\]*(?:\\.[^'\\]*)*)'[^\S\n]*,"
+    r"(?:[^\S\n]*(?://|#)(?P<comment>[^\n]*))?",
+    re.DOTALL
+)
+
+DOUBLE_ESCAPE_RE = re.compile(r'\\(?:([nrtvef\\$"])|([0-7]{1,3})|x([0-9a-fA-F]{1,2})|u\{([0-9a-fA-F]+)\})')
+DOUBLE_ESCAPES = {'n': '\n', 'r': '\r', 't': '\t', 'v': '\v', 'e': '\x1b', 'f': '\f', '\\': '\\', '$': '$', '"': '"'}
+SINGLE_ESCAPE_RE = re.compile(r"\\([\\'])")
+
+
+def decode_string(raw: str, quote: str) -> str:
+    '''
+    Value of a PHP string literal from its content between quotes
+    '''
+    if '\\' not in raw:
+        return raw
+    if quote == "'":
+        return SINGLE_ESCAPE_RE.sub(r'\1', raw)
+
+    def replace(m):
+        simple, octal, hexa, unicode = m.groups()
+        if simple is not None:
+            return DOUBLE_ESCAPES[simple]
+        if octal is not None:
+            return chr(int(octal, 8) & 0xff)
+        if hexa is not None:
+            return chr(int(hexa, 16))
+        return chr(int(unicode, 16))
+
+    return DOUBLE_ESCAPE_RE.sub(replace, raw)
+
+
+def encode_single(value: str) -> str:
+    '''
+    Content of a single quoted PHP string with the value
+    '''
+    return value.replace('\\', '\\\\').replace("'", "\\'")
+
+
+class PhpArrayParser:
+    '''
+    Parser of one source, parse() returns (entries, unparsed spans, position of the end of the array)
+    '''
+
+    def __init__(self, source: str):
+        self.source = source
+        self.pos = 0
+        self.entries = {}
+        self.unparsed = []
+
+    def _skip(self, pattern: re.Pattern) -> re.Match:
+        m = pattern.match(self.source, self.pos)
+        if m:
+            self.pos = m.end()
+        return m
+
+    def _skip_space_and_comments(self):
+        while True:
+            self._skip(WHITESPACE_RE)
+            if not (self._skip(LINE_COMMENT_RE) or self._skip(BLOCK_COMMENT_RE)):
+                return
+
+    def _skip_space_and_comments_before_comma(self):
+        while True:
+            self._skip(WHITESPACE_RE)
+            if not self._skip(BLOCK_COMMENT_RE):
+                return
+
+    def _simple_entry(self) -> bool:
+        m = self._skip(SIMPLE_ENTRY_RE)
+        if m is None:
+            return False
+        key, raw = m.group('key', 'raw')
+        key = decode_string(key, "'")
+        self.entries[key] = Entry(key, decode_string(raw, "'"), raw, "'", m.group('comment'), m.start(), m.end())
+        return True
+
+    def _string(self) -> (str, str):
+        '''
+        (raw content, quote) of a string literal at the position or None
+        '''
+        for quote, pattern in (("'", SINGLE_QUOTED_RE), ('"', DOUBLE_QUOTED_RE)):
+            m = self._skip(pattern)
+            if m:
+                return m.group('raw'), quote
+        return None
+
+    def _value(self) -> (str, str, str):
+        '''
+        (value, raw, quote) of a (concatenated) string or a scalar (quote is None) at the position or None
+        '''
+        first = self._string()
+        if first is None:
+            m = self._skip(SCALAR_RE)
+            return (m.group(0), m.group(0), None) if m else None
+        parts = [first]
+        while True:
+            start = self.pos
+            if not self._skip(DOT_RE):
+                break
+            part = self._string()
+            if part is None:
+                self.pos = start
+                break
+            parts.append(part)
+        value = ''.join(decode_string(raw, quote) for raw, quote in parts)
+        quotes = {quote for raw, quote in parts}
+        if len(quotes) == 1:
+            return value, ''.join(raw for raw, quote in parts), parts[0][1]
+        return value, encode_single(value), "'"
+
+    def _entry(self) -> bool:
+        start = self.pos
+        key = self._string()
+        if key is None or not self._skip(ARROW_RE):
+            return False
+        value = self._value()
+        if value is None:
+            return False
+        self._skip_space_and_comments_before_comma()
+        if self.source.startswith(',', self.pos):
+            self.pos += 1
+        elif not self.source.startswith((')', ']'), self.pos):
+            return False
+        # a comment on the same line belongs to the entry
+        self._skip(INLINE_WHITESPACE_RE)
+        comment = self._skip(LINE_COMMENT_RE)
+        key_value = decode_string(*key)
+        self.entries[key_value] = Entry(
+            key_value, value[0], value[1], value[2], comment.group('comment') if comment else None, start, self.pos
+        )
+        return True
+
+    def parse(self, start: int = 0) -> (dict, list, int):
+        array_start = ARRAY_START_RE.search(self.source, start)
+        if array_start is None:
+            self.unparsed.append(Span(start, len(self.source), self.source[start:]))
+            return self.entries, self.unparsed, len(self.source)
+        self.pos = array_start.end()
+        while True:
+            self._skip_space_and_comments()
+            if self.pos >= len(self.source):
+                return self.entries, self.unparsed, self.pos
+            tail = TAIL_RE.match(self.source, self.pos)
+            if tail or self.source[self.pos] in ')]':
+                return self.entries, self.unparsed, tail.end() if tail else self.pos + 1
+            if self._simple_entry():
+                continue
+            entry_start = self.pos
+            if not self._entry():
+                # skip to the end of the line (at least one character) and report it
+                self.pos = entry_start
+                end = max(self._skip(TO_LINE_END_RE).end(), entry_start + 1)
+                self.pos = end
+                self.unparsed.append(Span(entry_start, end, self.source[entry_start:end]))
+
+
+def parse_php_array(source: str, start: int = 0) -> (dict, list, int):
+    '''
+    key => Entry, unparsed spans and the position after the end of the array ("return array(...);")
+    searched from start
+    '''
+    return PhpArrayParser(source).parse(start)
+
+
+def line_of(source: str, pos: int) -> int:
+    return source.count('\n', 0, pos) + 1
+
+
+# the former regular expression of translate.py (lines of the array), only for the benchmark
+FORMER_KEY_RE = r'(?P<mark1>["\'])(?P<key>(?:(?=(?P<empty1>\\?))(?P=empty1).)*?)(?P=mark1)'
+FORMER_ORIG_RE = r'(?P<mark2>["\'])(?P<orig>(?:(?=(?P<empty2>\\?))(?P=empty2).)*?)(?P=mark2)'
+FORMER_ARRAY_LINE_RE = re.compile(
+    r'[\s]*' + FORMER_KEY_RE + r'\s*=>\s*' + FORMER_ORIG_RE + r'\s*,\s*' + r'(//(?P<comment>[^\n]*))?'
+)
+
+
+def make_synthetic_source(entries: int, length: int, seed: int = 0) -> str:
+    '''
+    Language file with entries strings of about length characters, with escaped quotes, placeholders,
+    double quoted strings and concatenations
+    '''
+    rng = random.Random(seed)
+    words = ['question', 'answer', 'comment', 'user', "user\\'s", '^site_title', '^1', '<b>', 'points', 'vote']
+    lines = ['<?php\n/*\n\tSynthetic language file\n*/\n\nreturn array(\n']
+    for i in range(entries):
+        text = ''
+        while len(text) < length:
+            text += rng.choice(words) + ' '
+        if i % 10 == 0:
+            lines.append(f'\t"key_{i}" => "{text.replace(chr(92) + chr(39), chr(39))}\\n",\n')
+        elif i % 10 == 1:
+            middle = text.index(' ', length // 2) + 1
+            lines.append(f"\t'key_{i}' => '{text[:middle]}' . '{text[middle:]}', // concatenated\n")
+        else:
+            lines.append(f"\t'key_{i}' => '{text}',\n")
+    lines.append(');\n')
+    return ''.join(lines)
+
+
+def make_malformed_source(length: int) -> str:
+    '''
+    Language file with one entry, its value is an unterminated string of about length characters with escaped quotes
+    (the regular expression backtracks over it from every position)
+    '''
+    return "<?php\n/*\n\tMalformed language file\n*/\n\nreturn array(\n\t'key' => '" + "user\\'s " * (length // 8) + \
+           "\n);\n"
+
+
+def best_time(fn, repeat: int) -> (float, object):
+    '''
+    The shortest time of repeat calls of fn() in seconds and the result
+    '''
+    best = None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = fn()
+        seconds = perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def benchmark(entries_list: list, length: int, malformed_lengths: list, repeat: int):
+    import os
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from translate import HEADER_RE
+
+    def regex_parse(source):
+        rest = source[HEADER_RE.match(source).end():]
+        return {m.group('key'): m.group('orig') for m in FORMER_ARRAY_LINE_RE.finditer(rest)}
+
+    print('Synthetic files:')
+    print('{:>10}{:>10}{:>10}{:>12}{:>12}{:>10}{:>14}{:>14}{:>14}'.format(
+        'entries', 'length', 'MB', 'regex [s]', 'parser [s]', 'speedup', 'regex found', 'regex wrong', 'parser found'
+    ))
+    for entries in entries_list:
+        source = make_synthetic_source(entries, length)
+        regex_seconds, regex_found = best_time(lambda: regex_parse(source), repeat)
+        parser_seconds, (parser_found, unparsed, end) = best_time(lambda: parse_php_array(source), repeat)
+        # e.g. concatenated values, the regular expression takes only a part of them
+        wrong = sum(1 for key, raw in regex_found.items() if key not in parser_found or parser_found[key].raw != raw)
+        print('{:>10}{:>10}{:>10.2f}{:>12.4f}{:>12.4f}{:>10.1f}{:>14}{:>14}{:>14}'.format(
+            entries, length, len(source) / 1e6, regex_seconds, parser_seconds, regex_seconds / parser_seconds,
+            len(regex_found), wrong, len(parser_found)
+        ))
+
+    print()
+    print('Unterminated string with escaped quotes:')
+    print('{:>10}{:>12}{:>12}{:>10}{:>16}'.format('length', 'regex [s]', 'parser [s]', 'speedup', 'parser unparsed'))
+    for malformed_length in malformed_lengths:
+        source = make_malformed_source(malformed_length)
+        regex_seconds, _ = best_time(lambda: regex_parse(source), repeat)
+        parser_seconds, (_, unparsed, _) = best_time(lambda: parse_php_array(source), repeat)
+        print('{:>10}{:>12.4f}{:>12.4f}{:>10.0f}{:>16}'.format(
+            malformed_length, regex_seconds, parser_seconds, regex_seconds / parser_seconds, len(unparsed)
+        ))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__description__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument(
+        'files',
+        metavar='<file>',
+        nargs='*',
+        help='language files, their unparsed spans are printed'
+    )
+
+    parser.add_argument(
+        '-bm', '--benchmark',
+        dest='benchmark',
+        action='store_true',
+        help='compare the parser with the regular expression of translate.py on synthetic files'
+    )
+
+    default = [1000, 10000, 100000]
+    parser.add_argument(
+        '-n', '--entries',
+        dest='entries',
+        metavar='<entries>',
+        type=int,
+        nargs='+',
+        required=False,
+        default=default,
+        help='counts of entries of synthetic files for --benchmark (default:' + str(default) + ')'
+    )
+
+    default = 200
+    parser.add_argument(
+        '-sl', '--string_length',
+        dest='length',
+        metavar='<length>',
+        type=int,
+        required=False,
+        default=default,
+        help='length of strings of synthetic files for --benchmark (default:' + str(default) + ')'
+    )
+
+    default = [1000, 2000, 4000]
+    parser.add_argument(
+        '-ml', '--malformed_lengths',
+        dest='malformed_lengths',
+        metavar='<length>',
+        type=int,
+        nargs='+',
+        required=False,
+        default=default,
+        help='lengths of unterminated strings for --benchmark (default:' + str(default) + ')'
+    )
+
+    default = 3
+    parser.add_argument(
+        '-r', '--repeat',
+        dest='repeat',
+        metavar='<repeat>',
+        type=int,
+        required=False,
+        default=default,
+        help='every measurement is repeated, the best time is used (default:' + str(default) + ')'
+    )
+
+    args = parser.parse_args()
+
+    for filename in args.files:
+        with open(filename, 'r') as f:
+            source = f.read()
+        entries, unparsed, end = parse_php_array(source)
+        not_strings = [entry.key for entry in entries.values() if entry.quote is None]
+        print(f'{filename}: {len(entries)} entries ({len(not_strings)} not strings), {len(unparsed)} unparsed spans')
+        for span in unparsed:
+            print(f'\t{filename}:{line_of(source, span.start)}: {span.text!r}')
+    if args.benchmark:
+        benchmark(args.entries, args.length, args.malformed_lengths, args.repeat)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Streaming writer of translated Question2Answer language files.
+
+The header, every translated entry and the tail are written straight to a buffered file,
+entries are written in the order of keys of the source as soon as all preceding entries are known
+(translations may come in any order) and the file is flushed after every written block.
+
+The file is written atomically: to a temporary file in the same directory, which replaces
+the output (os.replace) only after the tail is written and synced, so a crash never leaves
+a truncated file, the previous output stays untouched.
+'''
+import os
+import threading
+
+from php_parser import encode_single
+
+
+def one_line(text: str) -> str:
+    '''
+    The text for a line comment (multi-line originals)
+    '''
+    return text.replace('\r', '\\r').replace('\n', '\\n')
+
+
+def format_entry(key: str, original: str, translation: str, comment: str = None) -> str:
+    '''
+    Line of the output file, key and translation (decoded values) are encoded as single quoted strings,
+    the original is in the line comment (newlines escaped)
+    '''
+    line = f"\t'{encode_single(key)}' => '{encode_single(translation)}',  // {one_line(original)}"
+    if comment is not None:
+        line += f'\t|\t{comment}'
+    return line + '\n'
+
+
+def format_scalar(key: str, raw: str, comment: str = None) -> str:
+    '''
+    Line of the output file with a value which is not a string (number, constant), copied as it is in the source
+    '''
+    line = f"\t'{encode_single(key)}' => {raw},"
+    if comment is not None:
+        line += f'  //{comment}'
+    return line + '\n'
+
+
+class PhpArrayWriter:
+    '''
+    with PhpArrayWriter(filename, header, keys) as writer:
+        writer.add(key, original, translation, comment)  # in any order
+        writer.add_scalar(key, raw, comment)  # entries which are not strings
+    Entries are written in the order of keys, the file is complete after the with block,
+    keys which were not added are missing in it.
+    '''
+
+    def __init__(self, filename: str, header: str, keys, tail: str = ');', buffering: int = 64 * 1024):
+        self.filename = filename
+        self.tail = tail
+        self.keys = list(keys)
+        self.next_index = 0  # keys[:next_index] are written (or skipped)
+        self.pending = {}
+        self.written = 0
+        directory = os.path.dirname(os.path.abspath(filename))
+        os.makedirs(directory, exist_ok=True)
+        self.temp_filename = os.path.join(
+            directory, f'.{os.path.basename(filename)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        )
+        self.file = open(self.temp_filename, 'w', buffering=buffering)
+        self.file.write(header)
+
+    def add(self, key: str, original: str, translation: str, comment: str = None):
+        self.pending[key] = format_entry(key, original, translation, comment)
+        self._write_ready()
+
+    def add_scalar(self, key: str, raw: str, comment: str = None):
+        self.pending[key] = format_scalar(key, raw, comment)
+        self._write_ready()
+
+    def _write_ready(self):
+        written = self.written
+        while self.next_index < len(self.keys) and self.keys[self.next_index] in self.pending:
+            self.file.write(self.pending.pop(self.keys[self.next_index]))
+            self.next_index += 1
+            self.written += 1
+        if self.written != written:
+            self.file.flush()
+
+    def close(self):
+        '''
+        Writes the rest (keys without translation are skipped) and the tail and replaces the output file
+        '''
+        while self.next_index < len(self.keys):
+            self.next_index += 1
+            self._write_ready()
+        self.file.write(self.tail)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.temp_filename, self.filename)
+
+    def abort(self):
+        '''
+        The output file stays as it was
+        '''
+        self.file.close()
+        if os.path.exists(self.temp_filename):
+            os.remove(self.temp_filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Round trip of php_writer: written files are parsed back by php_parser with the same values.
+Run: python -m pytest test_php_writer.py (or python test_php_writer.py)
+'''
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from php_parser import parse_php_array
+from php_writer import PhpArrayWriter
+
+HEADER = "<?php\n/*\n\tTest\n*/\n\nreturn array(\n"
+
+
+class TestRoundTrip(unittest.TestCase):
+
+    def write_and_parse(self, values: dict, scalars: dict = None) -> dict:
+        scalars = scalars or {}
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'qa-lang-test.php')
+            with PhpArrayWriter(filename, HEADER, list(values) + list(scalars)) as writer:
+                # in reverse order, the writer keeps the order of keys
+                for key, raw in reversed(scalars.items()):
+                    writer.add_scalar(key, raw, ' a comment')
+                for key, value in reversed(values.items()):
+                    writer.add(key, value, value, 'comment')
+            with open(filename, 'r') as f:
+                source = f.read()
+        entries, unparsed, end = parse_php_array(source)
+        self.assertEqual(unparsed, [])
+        self.assertEqual(end, len(source))
+        return entries
+
+    def test_escapes(self):
+        values = {
+            'quote': "server's name",
+            'escaped_quote': "click the \\'Add Category\\' button",
+            'backslash': 'C:\\path\\',
+            'double_backslash': 'a \\\\ b',
+            'new_line': 'first\nsecond',
+            "key's": 'value',
+            'double_quotes': 'After "^" tab',
+        }
+        entries = self.write_and_parse(values)
+        self.assertEqual(list(entries), list(values))
+        self.assertEqual({key: entry.value for key, entry in entries.items()}, values)
+
+    def test_scalars(self):
+        entries = self.write_and_parse({'text': "it's"}, {'digits': '4', 'constant': 'QA_VERSION'})
+        self.assertEqual([(entry.key, entry.raw, entry.quote) for entry in entries.values()], [
+            ('text', "it\\'s", "'"), ('digits', '4', None), ('constant', 'QA_VERSION', None)
+        ])
+
+    def test_source_files(self):
+        from translate import IN_DIR, decompose_php_source, add_translation_message
+        for file in sorted(os.listdir(IN_DIR)):
+            with open(os.path.join(IN_DIR, file), 'r') as f:
+                source = f.read()
+            header_match, keys, lines, scalars, tail = decompose_php_source(source, filename=file)
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join(directory, file)
+                with PhpArrayWriter(filename, add_translation_message(header_match, 'cs'), keys, tail) as writer:
+                    for key, (raw, comment) in scalars.items():
+                        writer.add_scalar(key, raw, comment)
+                    for key, (orig, comment) in lines.items():
+                        writer.add(key, orig, orig, comment)
+                with open(filename, 'r') as f:
+                    output = f.read()
+            entries, unparsed, end = parse_php_array(output)
+            self.assertEqual(unparsed, [], file)
+            self.assertEqual(list(entries), keys, file)
+            self.assertEqual({key: entry.value for key, entry in entries.items() if entry.quote is not None},
+                             {key: orig for key, (orig, comment) in lines.items()}, file)
+            self.assertEqual({key: entry.raw for key, entry in entries.items() if entry.quote is None},
+                             {key: raw for key, (raw, comment) in scalars.items()}, file)
+
+
+if __name__ == '__main__':
+    unittest.main()
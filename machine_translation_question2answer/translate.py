@@ -12,61 +12,67 @@ import re
 import sys
 import argparse
 from datetime import datetime
-import translators as ts
-from time import sleep
-from pprint import pprint
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import namedtuple
 
 # root of repository in your filesystem
 THIS_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(THIS_FILE_DIR)
 
 from languages import LANGUAGES
+from translation_cache import TranslationCache, cache_stats
+from translation_pipeline import TranslationPipeline
+from translation_backends import BackendPool, get_backend
+from translation_memory import TranslationMemory
+from translation_journal import TranslationJournal, JournalExistsError
+from php_parser import parse_php_array, line_of
+from php_writer import PhpArrayWriter, one_line
 
 DATA_DIR = os.path.realpath(os.path.join(THIS_FILE_DIR, 'data'))
 IN_DIR = os.path.join(DATA_DIR, 'orig')
 OUT_DIR = os.path.join(DATA_DIR, 'outputs')
+CACHE_FILE = os.path.join(DATA_DIR, 'translation_cache.sqlite')
+JOURNAL_FILE = os.path.join(DATA_DIR, 'translation_journal.jsonl')
 
-# Construction of regular expression
+# Construction of regular expression of the header (lines of the array are parsed by php_parser)
 PREFIX_RE = r'\<\?php\n+'
 SPACES = r'[\s]*'
 HEADER_COMMENT_RE = r'/\*(?P<header_comment>[\d\D]*?)\*/'
 ARRAY_HEADER = r'(?P<array_header>return array\(\n)'
-KEY_RE = r'(?P<mark1>["\'])(?P<key>(?:(?=(?P<empty1>\\?))(?P=empty1).)*?)(?P=mark1)'
-ARROW_RE = r'\s*=>\s*'
-ORIG_RE = r'(?P<mark2>["\'])(?P<orig>(?:(?=(?P<empty2>\\?))(?P=empty2).)*?)(?P=mark2)'
-COMMENT_RE = r'//(?P<comment>[^\n]*)'
-ARRAY_LINE_RE = SPACES + KEY_RE + ARROW_RE + ORIG_RE + r'\s*,\s*' + r'(' + COMMENT_RE + r')?'
 
 HEADER_RE = re.compile(PREFIX_RE + HEADER_COMMENT_RE + SPACES + ARRAY_HEADER)
-ARRAY_LINE_RE = re.compile(ARRAY_LINE_RE)
 # TAIL_RE = re.compile(r'(?P<array_tail>)\s*;\s*\)')
 SEPARATOR_RE = re.compile(r'\s*\^[0-9]?\s*')
+# separator of the original and the comment of the source in the line comment of an output file (format_entry)
+OUTPUT_COMMENT_SEPARATOR = '\t|\t'
 
 REP = 'https://github.com/ivomarvan/samples_and_experiments/machine_translation_question2answer'
 
+# keys - all keys in the order of the source, lines - key => (original, comment) of strings,
+# scalars - key => (raw PHP value, comment) of entries which are not strings (numbers, constants)
+DecomposedSource = namedtuple('DecomposedSource', ['header_match', 'keys', 'lines', 'scalars', 'tail'])
 
-def decompose_php_source(source: str) -> (re.match, dict, str):
+
+def decompose_php_source(source: str, filename: str = '') -> DecomposedSource:
+    '''
+    Header, strings (to translate) and entries which are not strings (they are copied to the output unchanged)
+    and the tail. Originals of strings are decoded (escapes as PHP understands them), unparsed parts of the array
+    are reported to stderr
+    '''
     # take a header
     header_match = HEADER_RE.match(source)
-    start, end = header_match.regs[0]
-    rest = source[end:]
+    entries, unparsed, end = parse_php_array(source, header_match.start('array_header'))
+    for span in unparsed:
+        sys.stderr.write(f'{filename}:{line_of(source, span.start)}: unparsed: {span.text!r}\n')
     lines = {}
-    for line_match in ARRAY_LINE_RE.finditer(rest):
-        if line_match:
-            lines[line_match.group('key')] = (line_match.group('orig'), line_match.group('comment'))
+    scalars = {}
+    for key, entry in entries.items():
+        if entry.quote is None:
+            scalars[key] = (entry.raw, entry.comment)
+        else:
+            lines[key] = (entry.value, entry.comment)
     tail = ');'
-    return header_match, lines, tail
-
-def compose_php_source(header_match: re.match, translated_lines: dict, tail: str, lang: str) -> str:
-    ret_str = add_translation_message(header_match, lang)
-    for key, (original, translation, comment) in translated_lines.items():
-        translation = translation.replace("'", "\\'")
-        ret_str += f"\t'{key}' => '{translation}',  // {original}"
-        if not comment is None:
-            ret_str += f'\t|\t{comment}'
-        ret_str += '\n'
-    ret_str += tail
-    return ret_str
+    return DecomposedSource(header_match, list(entries), lines, scalars, tail)
 
 def add_translation_message(header_match: re.match, lang) -> str:
     tr_message = f'\n\tTranslated automatically by the software \n\t\t"{REP}"\n\t\t{datetime.now()}\n'
@@ -79,47 +85,139 @@ def add_translation_message(header_match: re.match, lang) -> str:
     after = header_str[end:end_of_header]
     return before + content + tr_message + after
 
-def translate_sentence(original:str, lang: str)-> str:
-    found_sep = False
-    ret_str = ''
+def read_previous_translations(filename: str) -> dict:
+    '''
+    key => (original, translation) from a file written by for_one_file, empty if the file does not exist,
+    the translation is decoded by php_parser, the original (newlines escaped) is taken from the line comment
+    '''
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, 'r') as f:
+        source = f.read()
+    entries, unparsed, end = parse_php_array(source)
+    previous = {}
+    for key, entry in entries.items():
+        if entry.quote is None or entry.comment is None:
+            continue
+        # format_entry writes "// original" and optionally "\t|\t" and the comment of the source
+        previous[key] = (entry.comment[1:].split(OUTPUT_COMMENT_SEPARATOR, 1)[0], entry.value)
+    return previous
+
+def diff_lines(lines: dict, previous: dict) -> (list, list, list):
+    '''
+    Keys added to the source, keys with a changed original and keys removed from the source
+    (compared with previous translations)
+    '''
+    added = [key for key in lines if key not in previous]
+    changed = [key for key, (orig, comment) in lines.items() if key in previous and previous[key][0] != one_line(orig)]
+    removed = [key for key in previous if key not in lines]
+    return added, changed, removed
+
+def split_sentence(original: str) -> (list, list):
+    '''
+    Parts of the sentence between separators (placeholders) and the separators,
+    parts[0] + separators[0] + parts[1] + ... + parts[-1] == original
+    '''
+    parts = []
+    separators = []
     last_end = 0
     for sep_match in SEPARATOR_RE.finditer(original):
-        found_sep = True
         start, end = sep_match.regs[0]
-        orig_part = original[last_end:start]
-        ret_str += translate_part(orig_part, lang) + original[start:end]
+        parts.append(original[last_end:start])
+        separators.append(original[start:end])
         last_end = end
-    if not found_sep:
-        return translate_part(original, lang)
-    else:
-        if last_end < len(original):
-            ret_str += translate_part(original[last_end:], lang)
-        return ret_str
-
-def translate_part(original: str, lang: str, translator = ts.google) -> str:
-    # @todo CACHE TRANSLATIONS
-    if original=='':
-        return original
-    sleep(0.01)
-    return translator(original, from_language='en', to_language=lang)
-
-def translate(lines: dict, lang: str) -> str:
-    result_dict = {}
-    for key, (orig, comment) in lines.items():
-        result_dict[key] = (orig, translate_sentence(orig, lang), comment)
-    return result_dict
-
-def for_one_file(in_filename: str, out_filname: str, lang: str):
-    with open(in_filename, 'r') as f:
-        source = f.read()
-    header_match, lines, tail = decompose_php_source(source)
-    translated_lines = translate(lines=lines, lang=lang)
-    result = compose_php_source(header_match=header_match, translated_lines=translated_lines, tail=tail, lang=lang)
-    os.makedirs(os.path.dirname(out_filname), exist_ok=True)
-    with open(out_filname, 'w') as f:
-        f.write(result)
-
-def for_all_files(in_dir: str, out_dir: str, lang: str, file_suffix: str = '.php'):
+    parts.append(original[last_end:])
+    return parts, separators
+
+def join_sentence(parts: list, separators: list) -> str:
+    return ''.join(part + separator for part, separator in zip(parts, separators + ['']))
+
+def translate_with_pipeline(lines: dict, lang: str, pipeline: TranslationPipeline, on_line=None) -> dict:
+    '''
+    key => (original, translation, comment), all fragments of all lines are translated concurrently by the pipeline
+    (its pool of translators, cache and rate limit), on_line(key, (original, translation, comment)) is called
+    as soon as all fragments of the line are translated (lines come in any order)
+    '''
+    split_lines = {key: split_sentence(orig) for key, (orig, comment) in lines.items()}
+    translations = {}
+    # fragment => keys of lines waiting for it, key => count of its distinct fragments not translated yet
+    waiting_for = {}
+    for key, (parts, separators) in split_lines.items():
+        for part in set(parts):
+            waiting_for.setdefault(part, []).append(key)
+    missing = {key: len(set(parts)) for key, (parts, separators) in split_lines.items()}
+
+    def line(key: str) -> tuple:
+        orig, comment = lines[key]
+        parts, separators = split_lines[key]
+        return orig, join_sentence([translations[part] for part in parts], separators), comment
+
+    def on_fragments(new_translations: dict):
+        translations.update(new_translations)
+        if on_line is None:
+            return
+        for fragment in new_translations:
+            for key in waiting_for.pop(fragment, ()):
+                missing[key] -= 1
+                if missing[key] == 0:
+                    on_line(key, line(key))
+
+    pipeline.translate_fragments(
+        [part for parts, separators in split_lines.values() for part in parts], lang, callback=on_fragments
+    )
+    return {key: line(key) for key in lines}
+
+def for_one_file(
+        in_filename: str, out_filname: str, lang: str, pipeline: TranslationPipeline, decomposed: tuple = None,
+        incremental: bool = False, journal: TranslationJournal = None
+) -> str:
+    '''
+    Returns a message about translated keys,
+    incremental - only keys added or changed since the previous output (out_filname) are translated,
+    journal - every translated line is recorded, lines found in it (resumed run) are not translated again
+    '''
+    if decomposed is None:
+        with open(in_filename, 'r') as f:
+            decomposed = decompose_php_source(f.read(), filename=in_filename)
+    header_match, keys, lines, scalars, tail = decomposed
+    previous = read_previous_translations(out_filname) if incremental else {}
+    added, changed, removed = diff_lines(lines, previous)
+    to_translate = {key: lines[key] for key in added + changed} if incremental else dict(lines)
+    file = os.path.basename(in_filename)
+    resumed = 0
+    # lines are streamed to the file in the order of the source as soon as they are translated,
+    # removed keys are dropped, the previous output is replaced only after all lines are written
+    with PhpArrayWriter(out_filname, add_translation_message(header_match, lang), keys, tail) as writer:
+        for key, (raw, comment) in scalars.items():
+            writer.add_scalar(key, raw, comment)
+        for key, (orig, comment) in lines.items():
+            if key not in to_translate:
+                writer.add(key, orig, previous[key][1], comment)
+            elif journal is not None:
+                translation = journal.get(file, lang, key, orig)
+                if translation is not None:
+                    del to_translate[key]
+                    resumed += 1
+                    writer.add(key, orig, translation, comment)
+
+        def on_line(key: str, line: tuple):
+            if journal is not None:
+                journal.record(file, lang, key, line[0], line[1])
+            writer.add(key, *line)
+
+        translate_with_pipeline(lines=to_translate, lang=lang, pipeline=pipeline, on_line=on_line)
+    message = f'translated {len(to_translate)}'
+    if incremental:
+        message = f'added {len(added)}, changed {len(changed)}, removed {len(removed)}, ' \
+                  f'kept {len(lines) - len(added) - len(changed)}, ' + message
+    if resumed:
+        message += f', resumed {resumed}'
+    return message
+
+def for_all_files(
+        in_dir: str, out_dir: str, lang: str, pipeline: TranslationPipeline, file_suffix: str = '.php',
+        incremental: bool = False, journal: TranslationJournal = None
+):
     print(in_dir)
     for root, dirs, files in sorted(os.walk(in_dir)):
         for file in sorted(files):
@@ -128,13 +226,156 @@ def for_all_files(in_dir: str, out_dir: str, lang: str, file_suffix: str = '.php
                 out_filename = os.path.join(out_dir, lang, file)
                 sys.stdout.write(f'{in_filename} ... ')
                 sys.stdout.flush()
-                for_one_file(in_filename=in_filename, out_filname=out_filename, lang=lang)
-                sys.stdout.write(f'done.\n')
+                message = for_one_file(
+                    in_filename=in_filename, out_filname=out_filename, lang=lang, pipeline=pipeline,
+                    incremental=incremental, journal=journal
+                )
+                sys.stdout.write(f'done ({message}).\n')
                 sys.stdout.flush()
         break  # only one level
 
-def main(in_dir: str, out_dir: str, lang: str):
-    for_all_files(in_dir=in_dir, out_dir=out_dir, lang=lang)
+def load_sources(in_dir: str, file_suffix: str = '.php') -> dict:
+    '''
+    in_filename => DecomposedSource, every file is read and decomposed only once
+    and the result is shared by all languages (it is only read)
+    '''
+    sources = {}
+    for root, dirs, files in sorted(os.walk(in_dir)):
+        for file in sorted(files):
+            if file.endswith(file_suffix):
+                in_filename = os.path.join(root, file)
+                with open(in_filename, 'r') as f:
+                    sources[in_filename] = decompose_php_source(f.read(), filename=in_filename)
+        break  # only one level
+    return sources
+
+def for_one_language(
+        sources: dict, out_dir: str, lang: str, make_pipeline, incremental: bool = False,
+        journal: TranslationJournal = None
+) -> TranslationPipeline:
+    '''
+    Translates all decomposed sources to lang, every file is written to out_dir/lang as soon as it is translated,
+    the pipeline is created by make_pipeline() in the current thread (sqlite connection of the cache)
+    '''
+    pipeline = make_pipeline()
+    try:
+        for in_filename, decomposed in sources.items():
+            for_one_file(
+                in_filename=in_filename, out_filname=os.path.join(out_dir, lang, os.path.basename(in_filename)),
+                lang=lang, pipeline=pipeline, decomposed=decomposed, incremental=incremental, journal=journal
+            )
+    finally:
+        if pipeline.cache is not None:
+            pipeline.cache.close()
+    return pipeline
+
+def for_all_languages(
+        in_dir: str, out_dir: str, langs: list, make_pipeline, workers: int = 4, file_suffix: str = '.php',
+        incremental: bool = False, journal: TranslationJournal = None
+) -> list:
+    '''
+    Fan-out: sources are decomposed once, languages are translated by workers (threads) concurrently,
+    make_pipeline() creates a pipeline (with its own cache connection) for every language.
+    Returns the used pipelines of successfully translated languages.
+    '''
+    sources = load_sources(in_dir, file_suffix=file_suffix)
+    print(f'{in_dir}: {len(sources)} files, {len(langs)} languages, {workers} workers')
+    pipelines = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(for_one_language, sources, out_dir, lang, make_pipeline, incremental, journal): lang
+            for lang in langs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            lang = futures[future]
+            try:
+                pipelines.append(future.result())
+                print(f'[{done}/{len(langs)}] {lang} done: {os.path.join(out_dir, lang)}')
+            except Exception as e:
+                print(f'[{done}/{len(langs)}] {lang} FAILED: {e!r}')
+    return pipelines
+
+def get_translator(names, failure_threshold: int = 5, cooldown: float = 30.0) -> BackendPool:
+    '''
+    Pool of backends (see translation_backends.get_backend) with failover and circuit breakers
+    '''
+    if isinstance(names, str):
+        names = [names]
+    return BackendPool([get_backend(name) for name in names], failure_threshold=failure_threshold, cooldown=cooldown)
+
+def main_languages(
+        in_dir: str, out_dir: str, langs: list, cache_file: str = None, translator='google',
+        concurrency: int = 8, rate: float = 10.0, retries: int = 3, batch_size: int = 50, batch_chars: int = 4000,
+        workers: int = 4, incremental: bool = False, breaker_failures: int = 5, breaker_cooldown: float = 30.0,
+        memory: bool = False, journal_file: str = None, resume: bool = False, fresh: bool = False
+):
+    '''
+    The same as main for more languages, rate and concurrency are shared by all workers
+    (all of them use the same pool of translators)
+    '''
+    workers = max(1, min(workers, len(langs)))
+    translator = get_translator(translator, failure_threshold=breaker_failures, cooldown=breaker_cooldown)
+
+    def make_pipeline():
+        # sqlite connection can not be shared by threads, every language has its own one
+        cache = TranslationCache(cache_file) if cache_file is not None else None
+        return TranslationPipeline(
+            translator, cache=cache, concurrency=max(1, concurrency // workers), rate=rate / workers,
+            retries=retries, batch_size=batch_size, batch_chars=batch_chars,
+            memory=TranslationMemory() if memory else None
+        )
+
+    journal = TranslationJournal(journal_file, resume=resume, fresh=fresh) if journal_file is not None else None
+    pipelines = []
+    try:
+        pipelines = for_all_languages(
+            in_dir=in_dir, out_dir=out_dir, langs=langs, make_pipeline=make_pipeline, workers=workers,
+            incremental=incremental, journal=journal
+        )
+    finally:
+        if journal is not None:
+            print(journal.stats())
+            # the journal is kept for --resume if any language failed
+            journal.close(complete=len(pipelines) == len(langs))
+    print(f'translator requests: {sum(p.requests for p in pipelines)}, '
+          f'failed: {sum(p.failures for p in pipelines)}, batches: {sum(p.batches for p in pipelines)}')
+    if memory:
+        print(f'translation memory: reused {sum(p.memory.reused for p in pipelines)}, '
+              f'rejected (ambiguous values) {sum(p.memory.rejected for p in pipelines)}')
+    caches = [p.cache for p in pipelines if p.cache is not None]
+    if caches:
+        print(cache_stats(sum(c.hits for c in caches), sum(c.misses for c in caches)))
+    print(translator.stats())
+
+def main(
+        in_dir: str, out_dir: str, lang: str, cache_file: str = None, translator='google',
+        concurrency: int = 8, rate: float = 10.0, retries: int = 3, batch_size: int = 50, batch_chars: int = 4000,
+        incremental: bool = False, breaker_failures: int = 5, breaker_cooldown: float = 30.0, memory: bool = False,
+        journal_file: str = None, resume: bool = False, fresh: bool = False
+):
+    journal = TranslationJournal(journal_file, resume=resume, fresh=fresh) if journal_file is not None else None
+    cache = TranslationCache(cache_file) if cache_file is not None else None
+    translator = get_translator(translator, failure_threshold=breaker_failures, cooldown=breaker_cooldown)
+    pipeline = TranslationPipeline(
+        translator, cache=cache, concurrency=concurrency, rate=rate, retries=retries,
+        batch_size=batch_size, batch_chars=batch_chars, memory=TranslationMemory() if memory else None
+    )
+    complete = False
+    try:
+        for_all_files(
+            in_dir=in_dir, out_dir=out_dir, lang=lang, pipeline=pipeline, incremental=incremental, journal=journal
+        )
+        complete = True
+    finally:
+        print(pipeline.stats())
+        print(translator.stats())
+        if journal is not None:
+            print(journal.stats())
+            # the journal is kept for --resume after an interrupted run
+            journal.close(complete=complete)
+        if cache is not None:
+            print(cache.stats())
+            cache.close()
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description=__description__)
@@ -172,6 +413,206 @@ if __name__ == '__main__':
         choices=lang_list,
         help=f'Languages (defaut="{default}", from {lang_list}')
 
+    parser.add_argument(
+        '-ls', '--languages',
+        dest='langs',
+        metavar='<lang>',
+        type=str,
+        nargs='+',
+        required=False,
+        default=None,
+        choices=lang_list + ['all'],
+        help='more languages at once or "all" (sources are parsed only once, languages are translated '
+             'by workers concurrently), overrides -l'
+    )
+
+    default = 4
+    parser.add_argument(
+        '-w', '--workers',
+        dest='workers',
+        metavar='<workers>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of languages translated concurrently with --languages (default:' + str(default) + ')'
+    )
+
+    default = CACHE_FILE
+    parser.add_argument(
+        '-c', '--cache',
+        dest='cache_file',
+        metavar='<cache_file>',
+        type=str,
+        required=False,
+        default=default,
+        help='sqlite file with cached translations (default:' + str(default) + ')'
+    )
+
+    parser.add_argument(
+        '-nc', '--no_cache',
+        dest='no_cache',
+        action='store_true',
+        help='do not use cached translations'
+    )
+
+    default = ['google']
+    parser.add_argument(
+        '-t', '--translator',
+        dest='translator',
+        metavar='<translator>',
+        type=str,
+        nargs='+',
+        required=False,
+        default=default,
+        help='translator engines from the translators package (google, bing, deepl, ...) '
+             'or "stub[:latency[:failure_rate]]" (local, for tests), more engines are used as a pool '
+             'with load balancing and failover (default:' + str(default) + ')'
+    )
+
+    default = 5
+    parser.add_argument(
+        '--breaker_failures',
+        dest='breaker_failures',
+        metavar='<failures>',
+        type=int,
+        required=False,
+        default=default,
+        help='an engine with so many consecutive failures is not used for a while (default:' + str(default) + ')'
+    )
+
+    default = 30.0
+    parser.add_argument(
+        '--breaker_cooldown',
+        dest='breaker_cooldown',
+        metavar='<seconds>',
+        type=float,
+        required=False,
+        default=default,
+        help='seconds for which a failing or throttled engine is not used (default:' + str(default) + ')'
+    )
+
+    default = 8
+    parser.add_argument(
+        '-j', '--concurrency',
+        dest='concurrency',
+        metavar='<concurrency>',
+        type=int,
+        required=False,
+        default=default,
+        help='maximal count of translator requests in flight (default:' + str(default) + ')'
+    )
+
+    default = 10.0
+    parser.add_argument(
+        '-r', '--rate',
+        dest='rate',
+        metavar='<rate>',
+        type=float,
+        required=False,
+        default=default,
+        help='maximal count of translator requests per second (default:' + str(default) + ')'
+    )
+
+    default = 3
+    parser.add_argument(
+        '--retries',
+        dest='retries',
+        metavar='<retries>',
+        type=int,
+        required=False,
+        default=default,
+        help='count of retries of a failed request, with exponential backoff (default:' + str(default) + ')'
+    )
+
+    default = 50
+    parser.add_argument(
+        '-b', '--batch_size',
+        dest='batch_size',
+        metavar='<batch_size>',
+        type=int,
+        required=False,
+        default=default,
+        help='maximal count of fragments translated by one request, 1 means no batching (default:' +
+             str(default) + ')'
+    )
+
+    default = 4000
+    parser.add_argument(
+        '--batch_chars',
+        dest='batch_chars',
+        metavar='<batch_chars>',
+        type=int,
+        required=False,
+        default=default,
+        help='maximal count of characters of one request (default:' + str(default) + ')'
+    )
+
+    parser.add_argument(
+        '-inc', '--incremental',
+        dest='incremental',
+        action='store_true',
+        help='translate only keys added or changed since the previous output in <out_dir>/<lang>, '
+             'other translations are kept'
+    )
+
+    parser.add_argument(
+        '-tm', '--translation_memory',
+        dest='memory',
+        action='store_true',
+        help='fragments which differ only in placeholders, numbers and HTML are translated only once'
+    )
+
+    default = JOURNAL_FILE
+    parser.add_argument(
+        '--journal',
+        dest='journal_file',
+        metavar='<journal_file>',
+        type=str,
+        required=False,
+        default=default,
+        help='append-only journal of translated lines (checkpoints), it is removed after a complete run '
+             '(default:' + str(default) + ')'
+    )
+
+    parser.add_argument(
+        '--resume',
+        dest='resume',
+        action='store_true',
+        help='continue an interrupted run, lines found in the journal are not translated again'
+    )
+
+    parser.add_argument(
+        '--fresh',
+        dest='fresh',
+        action='store_true',
+        help='start the journal of an interrupted run again (without --resume or --fresh such a run is refused)'
+    )
+
     args = parser.parse_args()
-    
-    main(in_dir=args.in_dir, out_dir=args.out_dir, lang=args.lang)
\ No newline at end of file
+
+    if args.resume and args.fresh:
+        parser.error('--resume and --fresh exclude each other')
+    try:
+        if args.langs is not None:
+            langs = lang_list if 'all' in args.langs else list(dict.fromkeys(args.langs))
+            main_languages(
+                in_dir=args.in_dir, out_dir=args.out_dir, langs=langs,
+                cache_file=None if args.no_cache else args.cache_file, translator=args.translator,
+                concurrency=args.concurrency, rate=args.rate, retries=args.retries,
+                batch_size=args.batch_size, batch_chars=args.batch_chars, workers=args.workers,
+                incremental=args.incremental, breaker_failures=args.breaker_failures,
+                breaker_cooldown=args.breaker_cooldown, memory=args.memory, journal_file=args.journal_file,
+                resume=args.resume, fresh=args.fresh
+            )
+            sys.exit(0)
+
+        main(
+            in_dir=args.in_dir, out_dir=args.out_dir, lang=args.lang,
+            cache_file=None if args.no_cache else args.cache_file, translator=args.translator,
+            concurrency=args.concurrency, rate=args.rate, retries=args.retries,
+            batch_size=args.batch_size, batch_chars=args.batch_chars, incremental=args.incremental,
+            breaker_failures=args.breaker_failures, breaker_cooldown=args.breaker_cooldown, memory=args.memory,
+            journal_file=args.journal_file, resume=args.resume, fresh=args.fresh
+        )
+    except JournalExistsError as e:
+        parser.error(str(e))
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Translator backends and their pool.
+
+A backend is a callable translator(text, from_language=..., to_language=...) -> str with __name__:
+    TranslatorsBackend - engine of the translators package (google, bing, deepl, ...), the package is imported
+                         only when the first text is translated, both its APIs are supported
+                         (ts.google(...) of older versions and ts.translate_text(..., translator=name) of newer ones)
+    StubTranslator     - deterministic local engine without network (tests, benchmarks, load tests)
+
+BackendPool is a backend too, it spreads requests over more backends:
+    - load balancing - the backend with the lowest expected latency (moving average x requests in flight,
+      penalized by its error rate) is used,
+    - failover - a failed request is repeated by the next backend, the error is raised only if all of them fail,
+    - circuit breaker - a backend with failure_threshold consecutive failures or throttled (HTTP 429) is not used
+      for cooldown seconds, then one probe request decides if it is closed again.
+BackendPool.translate_with_engine() returns also the name of the backend which translated the text,
+translations are cached by it (a change of backends of the pool does not invalidate the cache).
+'''
+import re
+import time
+import zlib
+import threading
+
+THROTTLED_RE = re.compile(r'\b429\b|too many requests|rate limit|throttl', re.IGNORECASE)
+# weight of the last request in moving averages of latency and error rate
+EWMA_ALPHA = 0.2
+
+
+class TranslatorsBackend:
+    '''
+    Engine of the translators package
+    '''
+
+    def __init__(self, name: str):
+        self.__name__ = name
+        self._translate = None
+
+    def _get_translate(self):
+        if self._translate is None:
+            import translators as ts
+            if hasattr(ts, self.__name__):
+                self._translate = getattr(ts, self.__name__)
+            else:
+                name = self.__name__
+                self._translate = lambda text, **kwargs: ts.translate_text(text, translator=name, **kwargs)
+        return self._translate
+
+    def __call__(self, text: str, from_language: str = 'en', to_language: str = 'en') -> str:
+        return self._get_translate()(text, from_language=from_language, to_language=to_language)
+
+
+class StubTranslator:
+    '''
+    Local translator for tests and benchmarks (no network):
+    every line "text" => "text [lang]" after latency seconds, failure_rate of calls raise ConnectionError.
+    Failures are deterministic: they depend only on the seed, the text and how many times the text was translated,
+    not on the order of concurrent calls.
+    '''
+
+    def __init__(self, latency: float = 0.05, failure_rate: float = 0.0, seed: int = 0, name: str = 'stub'):
+        self.__name__ = name
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.seed = seed
+        self.calls = 0
+        self.attempts = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, text: str, from_language: str = 'en', to_language: str = 'en') -> str:
+        with self.lock:
+            self.calls += 1
+            attempt = self.attempts.get(text, 0)
+            self.attempts[text] = attempt + 1
+        time.sleep(self.latency)
+        if self.failure_rate:
+            draw = zlib.crc32(f'{self.seed}:{attempt}:{to_language}:{text}'.encode()) / 2 ** 32
+            if draw < self.failure_rate:
+                raise ConnectionError(f'{self.__name__} translator failure')
+        return '\n'.join(f'{line} [{to_language}]' for line in text.split('\n'))
+
+
+def get_backend(spec: str):
+    '''
+    Backend from its specification: name of a translators engine (google, bing, ...)
+    or stub[:latency[:failure_rate]], e.g. stub:0.2:0.1
+    '''
+    name, *params = spec.split(':')
+    if name == 'stub':
+        return StubTranslator(*(float(param) for param in params), name=spec)
+    if params:
+        raise ValueError(f'only stub backend has parameters, not "{spec}"')
+    return TranslatorsBackend(name)
+
+
+class BackendState:
+    '''
+    Statistics and circuit breaker of one backend of the pool
+    '''
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = backend.__name__
+        self.requests = 0
+        self.failures = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.latency = None  # moving average in seconds, None before the first success
+        self.error_rate = 0.0  # moving average
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.opened_until = None  # breaker is open until this time (time.monotonic())
+        self.probing = False
+
+    def is_available(self, now: float) -> bool:
+        if self.opened_until is None:
+            return True
+        # half-open: only one probe request after the cooldown
+        return now >= self.opened_until and not self.probing
+
+    def score(self) -> float:
+        '''
+        Expected time of a request (lower is better), backends without a successful request are tried first
+        '''
+        latency = 0.001 if self.latency is None else self.latency
+        return latency * (1 + self.in_flight) / max(0.05, 1.0 - self.error_rate)
+
+    def state(self, now: float) -> str:
+        if self.opened_until is None:
+            return 'closed'
+        return 'half-open' if now >= self.opened_until else 'open'
+
+
+class BackendPool:
+    '''
+    Backend over more backends with load balancing, failover and circuit breakers (thread safe)
+    '''
+
+    def __init__(self, backends: list, failure_threshold: int = 5, cooldown: float = 30.0):
+        if not backends:
+            raise ValueError('at least one backend is needed')
+        self.states = [BackendState(backend) for backend in backends]
+        names = [state.name for state in self.states]
+        if len(set(names)) != len(names):
+            raise ValueError(f'names of backends must be unique, not {names}')
+        self.engines = names
+        self.__name__ = '+'.join(names)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+
+    def _acquire(self, tried: set) -> (BackendState, bool):
+        '''
+        The best available backend not tried yet (or None) and True for a probe of a half-open breaker,
+        its request is counted as in flight
+        '''
+        with self.lock:
+            now = time.monotonic()
+            available = [s for s in self.states if s.name not in tried and s.is_available(now)]
+            if not available:
+                return None, False
+            state = min(available, key=BackendState.score)
+            probe = state.opened_until is not None
+            state.probing = state.probing or probe
+            state.in_flight += 1
+            state.requests += 1
+            return state, probe
+
+    def _release(self, state: BackendState, probe: bool, seconds: float, error: Exception = None):
+        with self.lock:
+            state.in_flight -= 1
+            if probe:
+                state.probing = False
+            state.error_rate = (1 - EWMA_ALPHA) * state.error_rate + EWMA_ALPHA * (error is not None)
+            if error is None:
+                state.latency = seconds if state.latency is None else \
+                    (1 - EWMA_ALPHA) * state.latency + EWMA_ALPHA * seconds
+                state.consecutive_failures = 0
+                state.opened_until = None
+                return
+            state.failures += 1
+            state.consecutive_failures += 1
+            state.last_error = error
+            throttled = THROTTLED_RE.search(str(error)) is not None
+            state.throttled += throttled
+            if throttled or state.consecutive_failures >= self.failure_threshold or state.opened_until is not None:
+                state.opened_until = time.monotonic() + self.cooldown
+
+    def translate_with_engine(self, text: str, from_language: str = 'en', to_language: str = 'en') -> (str, str):
+        '''
+        Translation and the name of the backend which translated it
+        '''
+        tried = set()
+        last_error = None
+        while True:
+            state, probe = self._acquire(tried)
+            if state is None:
+                if last_error is None:
+                    errors = ', '.join(f'{s.name}: {s.last_error!r}' for s in self.states)
+                    raise ConnectionError(
+                        f'all backends of {self.__name__} are unavailable (circuit breakers open), last errors: {errors}'
+                    )
+                raise last_error
+            tried.add(state.name)
+            start = time.perf_counter()
+            try:
+                translation = state.backend(text, from_language=from_language, to_language=to_language)
+            except Exception as e:
+                self._release(state, probe, time.perf_counter() - start, e)
+                last_error = e
+                continue
+            self._release(state, probe, time.perf_counter() - start)
+            return translation, state.name
+
+    def __call__(self, text: str, from_language: str = 'en', to_language: str = 'en') -> str:
+        return self.translate_with_engine(text, from_language=from_language, to_language=to_language)[0]
+
+    def stats(self) -> str:
+        now = time.monotonic()
+        lines = []
+        for s in self.states:
+            latency = '-' if s.latency is None else f'{s.latency * 1000:.0f} ms'
+            lines.append(
+                f'{s.name}: requests {s.requests}, failed {s.failures} (throttled {s.throttled}), '
+                f'error rate {100 * s.error_rate:.0f} %, latency {latency}, breaker {s.state(now)}'
+            )
+        return '\n'.join(lines)
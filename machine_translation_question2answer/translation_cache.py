@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Persistent cache of translations (sqlite).
+
+Translations are stored by (source text, source language, target language, translator engine),
+so a rerun over the same sources does not call the translator at all.
+The engine is the backend which translated the text (not the whole pool of backends),
+a translation of any engine of the pool is used.
+'''
+import sqlite3
+from datetime import datetime
+
+
+def cache_stats(hits: int, misses: int) -> str:
+    '''
+    Hits and misses are counted by fragments, one translator request translates a batch of fragments
+    (translator requests are counted by TranslationPipeline)
+    '''
+    total = hits + misses
+    ratio = 100 * hits / total if total else 0.0
+    return f'cache hits: {hits}, misses: {misses} (fragments), hit ratio: {ratio:.1f} %'
+
+
+class TranslationCache:
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute(
+            'create table if not exists translations ('
+            'source text, from_lang text, to_lang text, engine text, translation text, created text, '
+            'primary key (source, from_lang, to_lang, engine))'
+        )
+        self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source: str, from_lang: str, to_lang: str, engines: list) -> str:
+        '''
+        Returns the stored translation of the first engine which has one or None
+        '''
+        found = dict(self.connection.execute(
+            'select engine, translation from translations where source = ? and from_lang = ? and to_lang = ? '
+            'and engine in (' + ', '.join('?' * len(engines)) + ')',
+            (source, from_lang, to_lang, *engines)
+        ).fetchall())
+        for engine in engines:
+            if engine in found:
+                self.hits += 1
+                return found[engine]
+        self.misses += 1
+        return None
+
+    def put(self, source: str, from_lang: str, to_lang: str, engine: str, translation: str):
+        self.connection.execute(
+            'insert or replace into translations (source, from_lang, to_lang, engine, translation, created) '
+            'values (?, ?, ?, ?, ?, ?)',
+            (source, from_lang, to_lang, engine, translation, datetime.now().isoformat())
+        )
+        self.connection.commit()
+
+    def stats(self) -> str:
+        return cache_stats(self.hits, self.misses)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Append-only checkpoint journal of translated lines (JSON lines).
+
+Every translated line (file, language, key, original, translation) is appended and flushed as soon as
+it is translated, so a killed or throttled run loses nothing. With resume the journal is read first
+and lines with the same original are not translated again (a changed source is translated again).
+An incomplete last line (the process was killed during writing) is ignored.
+
+A non-empty journal is a checkpoint of an interrupted run, it is never truncated silently: it is continued
+with resume, started again only with fresh, otherwise JournalExistsError is raised. The journal of a complete run
+is removed by close(complete=True).
+'''
+import os
+import json
+import threading
+
+
+class JournalExistsError(FileExistsError):
+    pass
+
+
+class TranslationJournal:
+
+    def __init__(self, filename: str, resume: bool = False, fresh: bool = False):
+        '''
+        resume - use lines of the existing journal and append to it,
+        fresh - start the existing journal again (its lines are lost)
+        '''
+        if not resume and not fresh and os.path.exists(filename) and os.path.getsize(filename) > 0:
+            raise JournalExistsError(
+                f'journal {filename} of an interrupted run exists, continue it with --resume or start again with --fresh'
+            )
+        self.filename = filename
+        self.done = {}  # (file, lang, key) => (original, translation)
+        self.resumed = 0
+        self.lock = threading.Lock()
+        if resume and os.path.exists(filename):
+            with open(filename, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.done[(record['file'], record['lang'], record['key'])] = \
+                        (record['original'], record['translation'])
+        os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        self.file = open(filename, 'a' if resume else 'w')
+        if resume and self.file.tell() > 0:
+            # the last line may be incomplete, the next record starts on a new line
+            self.file.write('\n')
+
+    def get(self, file: str, lang: str, key: str, original: str) -> str:
+        '''
+        Translation of the line from the journal or None (also if the original was changed)
+        '''
+        with self.lock:
+            found = self.done.get((file, lang, key))
+            if found is None or found[0] != original:
+                return None
+            self.resumed += 1
+            return found[1]
+
+    def record(self, file: str, lang: str, key: str, original: str, translation: str):
+        line = json.dumps(
+            {'file': file, 'lang': lang, 'key': key, 'original': original, 'translation': translation},
+            ensure_ascii=False
+        )
+        with self.lock:
+            self.done[(file, lang, key)] = (original, translation)
+            self.file.write(line + '\n')
+            self.file.flush()
+
+    def stats(self) -> str:
+        with self.lock:
+            return f'journal: {len(self.done)} translated lines, resumed {self.resumed}'
+
+    def close(self, complete: bool = False):
+        '''
+        complete - all lines are translated and written, the journal is not needed and it is removed
+        '''
+        self.file.close()
+        if complete:
+            os.remove(self.filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Translation memory: dedup of fragments which differ only in masked values and fuzzy search of similar ones.
+
+A fragment is normalised by masking values which are not translated:
+    ^ placeholders (^, ^1, ^site_title, ... as SEPARATOR_RE of translate.py), names of placeholders and constants
+    (site_title, QA_CACHE_DIRECTORY), numbers, HTML tags and entities; whitespace is collapsed.
+Fragments with the same normalised form are translated only once (the first one is the representative),
+the translation of the others is the translation of the representative with its masked values replaced
+by their values. It is used only if every replaced value is found exactly once in the translation,
+otherwise the fragment is translated on its own.
+
+Fuzzy matches (similar but not the same normalised forms, e.g. "1 answer" and "1 comment") are found
+by an index of character n-grams (Dice coefficient), they are for reuse by a human or for review.
+Run it with language files to see groups of duplicates and near-duplicates.
+'''
+import re
+import os
+import sys
+import argparse
+from collections import Counter
+
+MASK_RE = re.compile(
+    r'\^\w*'  # placeholders
+    r'|\b[A-Za-z][A-Za-z0-9]*_\w+'  # names of placeholders left by SEPARATOR_RE, constants
+    r'|<[^<>]*>|&#?\w+;'  # HTML
+    r'|\d+(?:[.,]\d+)*'  # numbers
+)
+MASK = '\x00'
+SPACES_RE = re.compile(r'\s+')
+
+
+def normalize(text: str) -> (str, list):
+    '''
+    Normalised form of the text and the masked values (in order)
+    '''
+    values = [m.group(0) for m in MASK_RE.finditer(text)]
+    return SPACES_RE.sub(' ', MASK_RE.sub(MASK, text)).strip(), values
+
+
+def value_re(value: str) -> str:
+    '''
+    Regular expression of the value, which is not a part of a longer word or number (1 in 10)
+    '''
+    ret_str = re.escape(value)
+    if re.match(r'\w', value):
+        ret_str = r'(?<!\w)' + ret_str
+    if re.search(r'\w$', value):
+        ret_str += r'(?!\w)'
+    return ret_str
+
+
+def fan_out(translation: str, values: list, new_values: list) -> str:
+    '''
+    Translation with values replaced by new values (in one pass) or None if it is not unambiguous
+    '''
+    if len(values) != len(new_values):
+        return None
+    replace = {}
+    for value, new_value in zip(values, new_values):
+        if value != new_value:
+            if replace.setdefault(value, new_value) != new_value:
+                return None
+    if not replace:
+        return translation
+    # all values, longer first, so that a replaced value is not found inside another one
+    pattern = re.compile('|'.join(value_re(value) for value in sorted(set(values), key=len, reverse=True)))
+    found = Counter(pattern.findall(translation))
+    if any(found[value] != 1 for value in replace):
+        return None
+    return pattern.sub(lambda m: replace.get(m.group(0), m.group(0)), translation)
+
+
+def get_ngrams(text: str, n: int) -> Counter:
+    text = f' {text.lower()} '
+    return Counter(text[i:i + n] for i in range(max(1, len(text) - n + 1)))
+
+
+class NgramIndex:
+    '''
+    Fuzzy search of similar texts by character n-grams (Dice coefficient of multisets of n-grams)
+    '''
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self.texts = []
+        self.ngrams = []
+        self.postings = {}  # n-gram => ids of texts
+
+    def add(self, text: str) -> int:
+        text_id = len(self.texts)
+        ngrams = get_ngrams(text, self.n)
+        self.texts.append(text)
+        self.ngrams.append(ngrams)
+        for ngram in ngrams:
+            self.postings.setdefault(ngram, []).append(text_id)
+        return text_id
+
+    def similar(self, text: str, limit: int = 5, min_similarity: float = 0.6) -> list:
+        '''
+        [(similarity, text id), ...] of the most similar texts, the best first
+        '''
+        ngrams = get_ngrams(text, self.n)
+        size = sum(ngrams.values())
+        common = Counter()
+        for ngram, count in ngrams.items():
+            for text_id in self.postings.get(ngram, ()):
+                common[text_id] += min(count, self.ngrams[text_id][ngram])
+        found = []
+        for text_id, shared in common.items():
+            similarity = 2 * shared / (size + sum(self.ngrams[text_id].values()))
+            if similarity >= min_similarity:
+                found.append((similarity, text_id))
+        return sorted(found, reverse=True)[:limit]
+
+
+class TranslationMemory:
+    '''
+    Translations of normalised fragments for one run (all languages), not thread safe
+    '''
+
+    def __init__(self, n: int = 3):
+        self.entries = {}  # (lang, normalised) => (fragment, translation)
+        self.index = NgramIndex(n)
+        self.indexed = {}  # normalised => id in the index
+        self.reused = 0
+        self.rejected = 0
+
+    def _index(self, normalized: str):
+        if normalized not in self.indexed:
+            self.indexed[normalized] = self.index.add(normalized)
+
+    def put(self, fragment: str, lang: str, translation: str):
+        normalized, values = normalize(fragment)
+        self.entries.setdefault((lang, normalized), (fragment, translation))
+        self._index(normalized)
+
+    def get(self, fragment: str, lang: str) -> str:
+        '''
+        Translation derived from a stored fragment with the same normalised form or None
+        '''
+        normalized, values = normalize(fragment)
+        found = self.entries.get((lang, normalized))
+        if found is None:
+            return None
+        stored_fragment, translation = found
+        translation = fan_out(translation, normalize(stored_fragment)[1], values)
+        if translation is None:
+            self.rejected += 1
+        elif stored_fragment != fragment:
+            self.reused += 1
+        return translation
+
+    def group(self, fragments) -> dict:
+        '''
+        representative => fragments with the same normalised form (the representative included)
+        '''
+        groups = {}
+        representatives = {}
+        for fragment in fragments:
+            normalized = normalize(fragment)[0]
+            representative = representatives.setdefault(normalized, fragment)
+            groups.setdefault(representative, []).append(fragment)
+        return groups
+
+    def similar(self, fragment: str, lang: str = None, limit: int = 5, min_similarity: float = 0.6) -> list:
+        '''
+        [(similarity, fragment, translation or None), ...] of fuzzy matches (not the same normalised form)
+        '''
+        normalized = normalize(fragment)[0]
+        found = []
+        for similarity, text_id in self.index.similar(normalized, limit + 1, min_similarity):
+            other = self.index.texts[text_id]
+            if other == normalized:
+                continue
+            stored = self.entries.get((lang, other), (other, None))
+            found.append((similarity, stored[0], stored[1]))
+        return found[:limit]
+
+    def stats(self) -> str:
+        return f'translation memory: {len(self.entries)} entries, reused {self.reused}, ' \
+               f'rejected (ambiguous values) {self.rejected}'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__description__, formatter_class=argparse.RawDescriptionHelpFormatter)
+
+    parser.add_argument(
+        'files',
+        metavar='<file>',
+        nargs='+',
+        help='language files'
+    )
+
+    default = 0.8
+    parser.add_argument(
+        '-ms', '--min_similarity',
+        dest='min_similarity',
+        metavar='<min_similarity>',
+        type=float,
+        required=False,
+        default=default,
+        help='minimal similarity of fuzzy matches (default:' + str(default) + ')'
+    )
+
+    args = parser.parse_args()
+
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from translate import decompose_php_source, split_sentence
+
+    memory = TranslationMemory()
+    fragments = []
+    for filename in args.files:
+        with open(filename, 'r') as f:
+            lines = decompose_php_source(f.read(), filename=filename).lines
+        for key, (orig, comment) in lines.items():
+            fragments.extend(part for part in split_sentence(orig)[0] if part.strip())
+    distinct = list(dict.fromkeys(fragments))
+    groups = memory.group(distinct)
+    print(f'fragments: {len(fragments)}, distinct: {len(distinct)}, distinct normalised: {len(groups)}')
+    print()
+    print('The same normalised form (translated once):')
+    for representative, group in groups.items():
+        if len(group) > 1:
+            print(f'\t{group}')
+    print()
+    print(f'Fuzzy matches (similarity >= {args.min_similarity}):')
+    for representative in groups:
+        for similarity, other, translation in memory.similar(representative, '', min_similarity=args.min_similarity):
+            print(f'\t{similarity:.2f}  {representative!r} ~ {other!r}')
+        memory.put(representative, '', representative)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "ivo@marvan.cz"
+__description__ = '''
+Concurrent (asyncio) translation of all fragments of a file.
+
+Fragments (parts of phrases between SEPARATOR_RE placeholders) are translated concurrently,
+the number of requests in flight is limited (concurrency), requests are spaced by a token bucket (rate)
+and failed requests are retried with exponential backoff.
+
+Fragments are packed into batches (at most batch_size fragments and batch_chars characters),
+one line per fragment with a numbered marker "[#i] ", and translated by one request.
+The translation is split back by the markers and validated (all markers in order, nothing empty),
+if it is misaligned, fragments of the batch are translated one by one.
+Fragments which would collide with the markers (new lines, "[#number]") are never batched.
+With a translation memory, fragments which differ only in masked values (placeholders, numbers, HTML)
+are translated only once, see translation_memory.py.
+translate.translate_with_pipeline() reassembles translated fragments into lines in the order of keys,
+a line is complete as soon as all its fragments are translated.
+'''
+import re
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from translation_cache import TranslationCache
+from translation_memory import TranslationMemory
+
+
+BATCH_MARKER = '[#{}] '
+BATCH_MARKER_RE = re.compile(r'^[^\S\n]*\[#(\d+)\][^\S\n]?', re.MULTILINE)
+COLLISION_RE = re.compile(r'\n|\[#\d+\]')
+
+
+def can_batch(fragment: str) -> bool:
+    return COLLISION_RE.search(fragment) is None
+
+
+def join_batch(fragments: list) -> str:
+    return '\n'.join(BATCH_MARKER.format(i) + fragment for i, fragment in enumerate(fragments))
+
+
+def split_batch(text: str, count: int) -> list:
+    '''
+    Translations of fragments of the batch, None if the translated batch is misaligned
+    '''
+    matches = list(BATCH_MARKER_RE.finditer(text))
+    if [int(m.group(1)) for m in matches] != list(range(count)):
+        return None
+    if text[:matches[0].start()].strip():
+        # something before the first marker
+        return None
+    ends = [m.start() for m in matches[1:]] + [len(text)]
+    translations = [text[m.end():end].strip() for m, end in zip(matches, ends)]
+    if not all(translations):
+        return None
+    return translations
+
+
+def keep_whitespace(fragment: str, translation: str) -> str:
+    '''
+    Translation with leading and trailing whitespace of the fragment (translators strip it)
+    '''
+    stripped = fragment.strip()
+    start = fragment.index(stripped)
+    return fragment[:start] + translation.strip() + fragment[start + len(stripped):]
+
+
+def make_batches(fragments: list, batch_size: int, batch_chars: int) -> list:
+    batches = []
+    batch = []
+    chars = 0
+    for fragment in fragments:
+        size = len(BATCH_MARKER.format(len(batch))) + len(fragment) + 1
+        if batch and (len(batch) >= batch_size or chars + size > batch_chars):
+            batches.append(batch)
+            batch = []
+            chars = 0
+        batch.append(fragment)
+        chars += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class TokenBucket:
+    '''
+    At most rate requests per second on average, at most capacity requests at once
+    '''
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self.lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class TranslationPipeline:
+
+    def __init__(
+            self,
+            translator,
+            cache: TranslationCache = None,
+            concurrency: int = 8,
+            rate: float = 10.0,
+            retries: int = 3,
+            backoff: float = 1.0,
+            from_lang: str = 'en',
+            batch_size: int = 50,
+            batch_chars: int = 4000,
+            memory: TranslationMemory = None
+    ):
+        self.translator = translator
+        self.cache = cache
+        self.concurrency = concurrency
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self.from_lang = from_lang
+        self.batch_size = batch_size
+        self.batch_chars = batch_chars
+        self.memory = memory
+        self.requests = 0
+        self.failures = 0
+        self.batches = 0
+        self.misaligned_batches = 0
+
+    @property
+    def engines(self) -> list:
+        '''
+        Names of backends of the translator (translations of all of them are taken from the cache)
+        '''
+        return getattr(self.translator, 'engines', [self.translator.__name__])
+
+    def _translate_with_engine(self, text: str, lang: str) -> (str, str):
+        if hasattr(self.translator, 'translate_with_engine'):
+            return self.translator.translate_with_engine(text, from_language=self.from_lang, to_language=lang)
+        return self.translator(text, from_language=self.from_lang, to_language=lang), self.translator.__name__
+
+    async def _call_translator(
+            self, text: str, lang: str, semaphore: asyncio.Semaphore, bucket: TokenBucket
+    ) -> (str, str):
+        '''
+        Translation and the name of the backend which translated it
+        '''
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                await bucket.acquire()
+                self.requests += 1
+                try:
+                    return await asyncio.get_running_loop().run_in_executor(
+                        None, lambda: self._translate_with_engine(text, lang)
+                    )
+                except Exception:
+                    self.failures += 1
+                    if attempt == self.retries:
+                        raise
+                # exponential backoff with jitter (requests of all tasks do not come back at once)
+                await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+
+    def _store(self, translations: dict, lang: str, engine: str) -> dict:
+        if self.cache is not None:
+            for fragment, translation in translations.items():
+                self.cache.put(fragment, self.from_lang, lang, engine, translation)
+        return translations
+
+    async def _translate_single(self, fragment: str, lang: str, semaphore, bucket) -> dict:
+        translation, engine = await self._call_translator(fragment.strip(), lang, semaphore, bucket)
+        return self._store({fragment: keep_whitespace(fragment, translation)}, lang, engine)
+
+    async def _translate_batch(self, batch: list, lang: str, semaphore, bucket) -> dict:
+        '''
+        Returns fragment => translation for all fragments of the batch (stored to the cache as soon as they arrive)
+        '''
+        if len(batch) == 1:
+            return await self._translate_single(batch[0], lang, semaphore, bucket)
+        self.batches += 1
+        text = join_batch([fragment.strip() for fragment in batch])
+        translation, engine = await self._call_translator(text, lang, semaphore, bucket)
+        translations = split_batch(translation, len(batch))
+        if translations is not None:
+            return self._store({f: keep_whitespace(f, t) for f, t in zip(batch, translations)}, lang, engine)
+        # misaligned, one by one
+        self.misaligned_batches += 1
+        results = {}
+        for single in await asyncio.gather(*(self._translate_single(f, lang, semaphore, bucket) for f in batch)):
+            results.update(single)
+        return results
+
+    def _make_batches(self, fragments: list) -> list:
+        return make_batches(
+            [f for f in fragments if can_batch(f)], self.batch_size, self.batch_chars
+        ) + [[f] for f in fragments if not can_batch(f)]
+
+    async def _run_batches(self, fragments: list, lang: str, semaphore, bucket, on_batch):
+        '''
+        Translates fragments, on_batch(fragment => translation) is called for every batch as soon as it is translated
+        '''
+        tasks = [
+            asyncio.ensure_future(self._translate_batch(batch, lang, semaphore, bucket))
+            for batch in self._make_batches(fragments)
+        ]
+        try:
+            for future in asyncio.as_completed(tasks):
+                on_batch(await future)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def translate_fragments_async(self, fragments, lang: str, callback=None) -> dict:
+        '''
+        Returns fragment => translation, every distinct fragment is translated only once,
+        callback(fragment => translation) is called with cached translations and then with every translated batch
+        '''
+        results = {}
+        missing = []
+        for fragment in dict.fromkeys(fragments):
+            if fragment.strip() == '':
+                results[fragment] = fragment
+                continue
+            translation = None
+            if self.cache is not None:
+                translation = self.cache.get(fragment, self.from_lang, lang, self.engines)
+            if translation is None:
+                missing.append(fragment)
+            else:
+                results[fragment] = translation
+        groups = {}
+        if self.memory is not None:
+            # fragments with the same normalised form as a known one are not translated at all,
+            # from the others only representatives of groups are translated
+            for fragment, translation in results.items():
+                self.memory.put(fragment, lang, translation)
+            not_known = []
+            for fragment in missing:
+                translation = self.memory.get(fragment, lang)
+                if translation is None:
+                    not_known.append(fragment)
+                else:
+                    results[fragment] = keep_whitespace(fragment, translation)
+            groups = self.memory.group(not_known)
+            missing = list(groups)
+        if callback is not None and results:
+            callback(dict(results))
+        semaphore = asyncio.Semaphore(self.concurrency)
+        bucket = TokenBucket(self.rate)
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+        not_reused = []
+
+        def on_batch(translations: dict):
+            if self.memory is not None:
+                for fragment, translation in list(translations.items()):
+                    self.memory.put(fragment, lang, translation)
+                    for other in groups.get(fragment, [])[1:]:
+                        other_translation = self.memory.get(other, lang)
+                        if other_translation is None:
+                            not_reused.append(other)
+                        else:
+                            translations[other] = keep_whitespace(other, other_translation)
+            results.update(translations)
+            if callback is not None:
+                callback(translations)
+
+        await self._run_batches(missing, lang, semaphore, bucket, on_batch)
+        if not_reused:
+            # values of the representative were not found in its translation unambiguously
+            await self._run_batches(not_reused, lang, semaphore, bucket, on_batch)
+        return results
+
+    def translate_fragments(self, fragments, lang: str, callback=None) -> dict:
+        return asyncio.run(self.translate_fragments_async(fragments, lang, callback=callback))
+
+    def stats(self) -> str:
+        ret_str = f'translator requests: {self.requests}, failed: {self.failures}, ' \
+                  f'batches: {self.batches}, misaligned batches: {self.misaligned_batches}'
+        if self.memory is not None:
+            ret_str += '\n' + self.memory.stats()
+        return ret_str
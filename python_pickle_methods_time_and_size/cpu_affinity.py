@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Ivo Marvan"
+__email__ = "ivo@marvan.cz"
+__description__ = '''
+    CPUs available for the benchmark.
+
+    Counts of threads of multi-threaded variants are derived from the CPUs allowed for this process
+    (sched_getaffinity, not all CPUs of the machine) and processes of the --jobs pool are pinned
+    to one of them, so parallel measurements do not migrate between CPUs.
+
+    (MIT License)
+'''
+
+import os
+
+
+def get_available_cpus() -> int:
+    return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+
+
+def get_thread_counts(max_threads: int = None) -> list:
+    '''
+    Powers of 2 up to max_threads (default: count of available CPUs), max_threads itself is always included
+    '''
+    max_threads = max_threads or get_available_cpus()
+    counts = [2**i for i in range(max_threads.bit_length()) if 2**i < max_threads]
+    return counts + [max_threads]
+
+
+def pin_to_cpu(worker_index: int) -> int:
+    '''
+    Pin the current process to one CPU (from the CPUs allowed for this process), returns the CPU number
+    or None on platforms without sched_setaffinity.
+    '''
+    if not hasattr(os, 'sched_setaffinity'):
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+    cpu = cpus[worker_index % len(cpus)]
+    os.sched_setaffinity(0, {cpu})
+    return cpu
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Ivo Marvan"
+__email__ = "ivo@marvan.cz"
+__description__ = '''
+    Memory consumption of one function call.
+
+    Measures (in bytes):
+        rss_peak - peak resident set size during the call minus RSS before the call
+        py_peak  - peak of memory allocated by Python and NumPy (tracemalloc) during the call
+        copied   - memory held by the returned object (data copied from a file into memory,
+                   near zero for zero-copy/memory mapped reading, zero for writing)
+
+    The call can run in an isolated (forked) process, so the numbers of one call do not bleed into another.
+    Peak RSS is read from /proc/self/status (Linux), elsewhere from getrusage, which can not be reset.
+
+    (MIT License)
+'''
+
+import sys
+import resource
+import tracemalloc
+import multiprocessing
+from functools import partial
+
+# names of values returned by measure_memory() (in this order they are added to the result table)
+MEMORY_STATS = ['rss_peak', 'py_peak', 'copied']
+
+PROC_STATUS = '/proc/self/status'
+PROC_CLEAR_REFS = '/proc/self/clear_refs'
+
+
+def _read_proc_status(field: str) -> int:
+    with open(PROC_STATUS) as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024  # kB
+    raise KeyError(field)
+
+
+def _maxrss() -> int:
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kB, macOS bytes
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def current_rss() -> int:
+    try:
+        return _read_proc_status('VmRSS')
+    except (OSError, KeyError):
+        return _maxrss()
+
+
+def reset_peak_rss() -> bool:
+    '''
+    Reset peak RSS of this process (Linux >= 4.0), returns False if it is not possible
+    '''
+    try:
+        with open(PROC_CLEAR_REFS, 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss() -> int:
+    try:
+        return _read_proc_status('VmHWM')
+    except (OSError, KeyError):
+        return _maxrss()
+
+
+def _arrow_allocated() -> int:
+    # pyarrow allocates outside of tracemalloc, count it only if pyarrow is already used
+    pyarrow = sys.modules.get('pyarrow')
+    return pyarrow.total_allocated_bytes() if pyarrow is not None else 0
+
+
+def measure_memory(fn) -> dict:
+    '''
+    Call fn() once and return its memory consumption (see MEMORY_STATS)
+    '''
+    reset_peak_rss()
+    rss_before = current_rss()
+    arrow_before = _arrow_allocated()
+    tracemalloc.start()
+    try:
+        py_before, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        py_after, py_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    ret = {
+        'rss_peak': max(peak_rss() - rss_before, 0),
+        'py_peak': py_peak - py_before,
+        'copied': max(py_after - py_before + _arrow_allocated() - arrow_before, 0),
+    }
+    del result
+    return ret
+
+
+def _isolated_child(fn, sender):
+    try:
+        sender.send((True, fn()))
+    except Exception as e:
+        sender.send((False, str(e)))
+    finally:
+        sender.close()
+
+
+def run_isolated(fn):
+    '''
+    Call fn() in a new process and return its result (it has to be picklable).
+    The process is forked (where it is possible), so fn can be any callable (it is not pickled).
+    '''
+    start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+    ctx = multiprocessing.get_context(start_method)
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_isolated_child, args=(fn, sender))
+    process.start()
+    sender.close()
+    try:
+        ok, result = receiver.recv()
+    except EOFError:
+        process.join()
+        ok, result = False, 'isolated process finished with exit code {}'.format(process.exitcode)
+    finally:
+        receiver.close()
+        process.join()
+    if not ok:
+        raise RuntimeError(result)
+    return result
+
+
+def measure_memory_isolated(fn) -> dict:
+    '''
+    measure_memory(fn) in a new process
+    '''
+    return run_isolated(partial(measure_memory, fn))
+
+
+def measure_peak_rss(fn) -> (object, int):
+    '''
+    Returns result of fn() and peak RSS during the call minus RSS before the call
+    '''
+    reset_peak_rss()
+    rss_before = current_rss()
+    result = fn()
+    return result, max(peak_rss() - rss_before, 0)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Ivo Marvan"
+__email__ = "ivo@marvan.cz"
+__description__ = '''
+    Cold cache reading: files are evicted from the OS page cache before they are read,
+    so the reading goes to the disk (Linux, posix_fadvise).
+
+    (MIT License)
+'''
+
+import os
+
+
+def evict_from_page_cache(file_path):
+    '''
+    Drop cached pages of the file from the OS page cache, so the next reading goes to the disk.
+    Dirty pages are not dropped by POSIX_FADV_DONTNEED, so they are written (fsync) first.
+    '''
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
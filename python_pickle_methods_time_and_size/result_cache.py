@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Ivo Marvan"
+__email__ = "ivo@marvan.cz"
+__description__ = '''
+    Persistent store of measured results (sqlite), so unchanged variants are not measured again.
+
+    A result is valid for the same
+        - variant (id from get_filename_kind_params_id) and source code of its test functions
+        - input data (hash of DataFrame)
+        - versions of libraries used by the kind of the variant
+        - machine (fingerprint of hardware, OS and Python)
+        - measurement settings (timing, cold cache, memory, subset, count of parallel pinned processes)
+    If any of them changes, the key is different and the variant is measured again
+    (for example after upgrade of pyarrow only arrow based variants are measured).
+
+    (MIT License)
+'''
+
+import os
+import json
+import inspect
+import hashlib
+import sqlite3
+import platform
+from datetime import datetime
+from importlib import metadata
+import pandas as pd
+
+# kind of variant => libraries which influence its results
+KIND_LIBRARIES = {
+    'feather': ['pandas', 'pyarrow'],
+    'sql': ['pandas'],
+    'csv': ['pandas'],
+    'hdf': ['pandas', 'tables'],
+    'pickle': ['pandas'],
+    'parquet': ['pandas', 'pyarrow', 'fastparquet'],
+    'arrow_ipc': ['pandas', 'pyarrow'],
+    'npy': ['pandas', 'numpy'],
+    'pickle_oob': ['pandas', 'numpy'],
+    'arrow_dtypes': ['pandas', 'pyarrow'],
+    'parquet_mt': ['pandas', 'pyarrow'],
+    'feather_mt': ['pandas', 'pyarrow'],
+    'hdf_mt': ['pandas', 'tables'],
+    'csv_pgzip': ['pandas', 'pyarrow'],
+}
+DEFAULT_LIBRARIES = ['pandas', 'numpy', 'pyarrow', 'tables', 'fastparquet']
+
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def library_versions(kind: str) -> dict:
+    versions = {}
+    for library in KIND_LIBRARIES.get(kind, DEFAULT_LIBRARIES):
+        try:
+            versions[library] = metadata.version(library)
+        except metadata.PackageNotFoundError:
+            versions[library] = None
+    if kind == 'sql':
+        versions['sqlite'] = sqlite3.sqlite_version
+    return versions
+
+
+def source_hash(*functions) -> str:
+    return _sha1(''.join(inspect.getsource(fn) for fn in functions).encode())
+
+
+def dataset_hash(df: pd.DataFrame) -> str:
+    hasher = hashlib.sha1()
+    hasher.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    hasher.update(repr(list(df.columns)).encode())
+    hasher.update(repr(list(df.dtypes.astype(str))).encode())
+    hasher.update(repr(df.index.dtype).encode())
+    return hasher.hexdigest()
+
+
+def machine_fingerprint() -> str:
+    parts = [
+        platform.node(), platform.system(), platform.release(), platform.machine(), platform.processor(),
+        os.cpu_count(), platform.python_implementation(), platform.python_version()
+    ]
+    return _sha1(repr(parts).encode())
+
+
+class ResultCache:
+    '''
+    Rows of the result table stored by key (see get_key),
+    with refresh all variants are measured again (and stored results are replaced)
+    '''
+
+    def __init__(self, filename: str, refresh: bool = False):
+        self.filename = filename
+        self.refresh = refresh
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute(
+            'create table if not exists results (key text primary key, variant text, row text, created text)'
+        )
+        self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+        self._machine = machine_fingerprint()
+
+    def get_key(self, variant: str, kind: str, data_hash: str, source_hash: str, settings: dict) -> str:
+        parts = {
+            'variant': variant,
+            'source': source_hash,
+            'data': data_hash,
+            'libraries': library_versions(kind),
+            'machine': self._machine,
+            'settings': settings,
+        }
+        return _sha1(json.dumps(parts, sort_keys=True, default=str).encode())
+
+    def get(self, key: str) -> dict:
+        '''
+        Returns the stored row or None
+        '''
+        found = None
+        if not self.refresh:
+            found = self.connection.execute('select row from results where key = ?', (key,)).fetchone()
+        if found is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(found[0])
+
+    def put(self, key: str, variant: str, row: dict):
+        self.connection.execute(
+            'insert or replace into results (key, variant, row, created) values (?, ?, ?, ?)',
+            (key, variant, json.dumps(row, default=float), datetime.now().isoformat())
+        )
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
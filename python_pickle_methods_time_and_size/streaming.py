@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Ivo Marvan"
+__email__ = "ivo@marvan.cz"
+__description__ = '''
+    Chunked (streaming) writing and reading of data storage methods.
+
+    Data are written chunk by chunk through append APIs (csv mode='a', HDF append, parquet row groups,
+    to_sql chunks, Arrow IPC stream) and read back in chunks, so the whole data never has to fit in memory.
+    Only time spent in writing/reading is measured, not time of producing chunks of the input data.
+
+    (MIT License)
+'''
+
+import os
+import sqlite3
+from time import perf_counter
+import pandas as pd
+
+# method => variants of parameters (for streaming)
+stream_descriptions = {
+    'csv': {
+        # appending to gzip file creates a multi-member gzip file
+        'compression': [None, 'gzip']
+    },
+    'hdf': {
+        'complib': ['blosc', 'zlib'],
+        'complevel': [0, 5]
+    },
+    'parquet': {
+        'compression': ['snappy', 'zstd', None]
+    },
+    'sql': {},
+    'arrow_stream': {
+        'compression': [None, 'lz4', 'zstd']
+    },
+}
+
+
+def stream_csv_write(chunks, filename, compression):
+    mode, header = 'w', True
+    for chunk in chunks:
+        chunk.to_csv(filename, mode=mode, header=header, compression=compression)
+        mode, header = 'a', False
+
+
+def stream_csv_read(filename, chunksize, compression):
+    with pd.read_csv(filename, index_col=0, compression=compression, chunksize=chunksize) as reader:
+        yield from reader
+
+
+def stream_hdf_write(chunks, filename, complib, complevel):
+    with pd.HDFStore(filename, mode='w', complib=complib, complevel=complevel) as store:
+        for chunk in chunks:
+            store.append('test', chunk)
+
+
+def stream_hdf_read(filename, chunksize, complib, complevel):
+    with pd.HDFStore(filename, mode='r') as store:
+        yield from store.select('test', chunksize=chunksize)
+
+
+def stream_parquet_write(chunks, filename, compression):
+    # every chunk is one row group
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = pq.ParquetWriter(filename, table.schema, compression=compression)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def stream_parquet_read(filename, chunksize, compression):
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(filename).iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def stream_sql_write(chunks, filename):
+    if os.path.exists(filename):
+        os.remove(filename)
+    sql_db = sqlite3.connect(filename)
+    try:
+        for chunk in chunks:
+            chunk.to_sql(name='test_table', con=sql_db, if_exists='append', chunksize=len(chunk))
+    finally:
+        sql_db.close()
+
+
+def stream_sql_read(filename, chunksize):
+    sql_db = sqlite3.connect(filename)
+    try:
+        yield from pd.read_sql_query('select * from test_table', sql_db, chunksize=chunksize)
+    finally:
+        sql_db.close()
+
+
+def stream_arrow_stream_write(chunks, filename, compression):
+    import pyarrow as pa
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    writer = None
+    schema = None
+    with pa.OSFile(filename, 'wb') as sink:
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                if writer is None:
+                    schema = table.schema
+                    writer = pa.ipc.new_stream(sink, schema, options=options)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def stream_arrow_stream_read(filename, chunksize, compression):
+    # batches have the size of written chunks
+    import pyarrow as pa
+    with pa.OSFile(filename, 'rb') as source:
+        for batch in pa.ipc.open_stream(source):
+            yield batch.to_pandas()
+
+
+def chunk_bytes(chunk: pd.DataFrame) -> int:
+    return int(chunk.memory_usage(index=True, deep=True).sum())
+
+
+class ChunkCounter:
+    '''
+    Iterates chunks of the source, counts rows and bytes (in memory)
+    and measures time spent in the source and in counting (source_time)
+    '''
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.rows = 0
+        self.bytes = 0
+        self.source_time = 0.0
+
+    def __iter__(self):
+        iterator = iter(self.chunks)
+        while True:
+            start = perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                self.source_time += perf_counter() - start
+                return
+            self.rows += len(chunk)
+            self.bytes += chunk_bytes(chunk)
+            self.source_time += perf_counter() - start
+            yield chunk
+
+
+def measure_stream_write(chunks, filename: str, kind: str, params: dict) -> dict:
+    '''
+    Write all chunks, returns time of writing (without time of the source), count of rows and bytes
+    '''
+    counter = ChunkCounter(chunks)
+    start = perf_counter()
+    globals()['stream_' + kind + '_write'](counter, filename, **params)
+    seconds = perf_counter() - start - counter.source_time
+    return {'time': seconds, 'rows': counter.rows, 'bytes': counter.bytes}
+
+
+def measure_stream_read(filename: str, kind: str, params: dict, chunksize: int) -> dict:
+    '''
+    Read all chunks, returns time of reading (without counting), count of rows and bytes
+    '''
+    rows = 0
+    size = 0
+    seconds = 0.0
+    iterator = iter(globals()['stream_' + kind + '_read'](filename, chunksize, **params))
+    while True:
+        start = perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            seconds += perf_counter() - start
+            break
+        seconds += perf_counter() - start
+        rows += len(chunk)
+        size += chunk_bytes(chunk)
+    return {'time': seconds, 'rows': rows, 'bytes': size}
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Ivo Marvan"
+__email__ = "ivo@marvan.cz"
+__description__ = '''
+    Synthetic test data with controllable shape (vectorised by NumPy).
+
+    Parameters of generated DataFrame (spec):
+        rows            count of rows (up to 10^8, for big data use generate_chunks)
+        floats          count of float64 columns
+        ints            count of int64 columns
+        categories      count of categorical columns
+        cardinality     count of distinct values of categorical columns
+        strings         count of string columns
+        string_length   length of strings
+        nulls           ratio of missing values (0..1) in every column
+        entropy         ratio of distinct values (0..1) in float, int and string columns,
+                        low entropy means repeated values (well compressible data)
+        datetime_index  1 for DatetimeIndex (with frequency freq), 0 for RangeIndex
+        freq            frequency of DatetimeIndex (pandas offset alias)
+        seed            seed of the random generator
+
+    The spec can be written as a string, for example
+        "rows=1e6,floats=4,categories=2,cardinality=100,strings=1,string_length=12,nulls=0.05,entropy=0.5"
+
+    (MIT License)
+'''
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SPEC = {
+    'rows': 100000,
+    'floats': 4,
+    'ints': 1,
+    'categories': 1,
+    'cardinality': 100,
+    'strings': 1,
+    'string_length': 10,
+    'nulls': 0.0,
+    'entropy': 1.0,
+    'datetime_index': 1,
+    'freq': 'min',
+    'seed': 0,
+}
+
+# kind of columns => prefix of names of columns
+COLUMN_PREFIXES = {'floats': 'float', 'ints': 'int', 'categories': 'category', 'strings': 'string'}
+ALPHABET = np.frombuffer(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', dtype=np.uint8)
+START_DATETIME = '2016-12-28'
+
+
+def parse_spec(spec_str: str) -> dict:
+    '''
+    "key=value,key=value" => spec (dict with all keys of DEFAULT_SPEC)
+    '''
+    spec = dict(DEFAULT_SPEC)
+    for item in filter(None, (item.strip() for item in spec_str.split(','))):
+        key, value = item.split('=', 1)
+        key = key.strip()
+        if key not in DEFAULT_SPEC:
+            raise ValueError('unknown parameter "{}" of synthetic data, use some of {}'.format(key, list(DEFAULT_SPEC)))
+        default = DEFAULT_SPEC[key]
+        if isinstance(default, str):
+            spec[key] = value.strip()
+        elif isinstance(default, int):
+            spec[key] = int(float(value))  # allows 1e6
+        else:
+            spec[key] = float(value)
+    return spec
+
+
+def spec_name(spec: dict) -> str:
+    '''
+    Short name of spec (only values different from defaults), usable as a name of directory
+    '''
+    parts = ['{}={}'.format(key, value) for key, value in spec.items() if value != DEFAULT_SPEC.get(key)]
+    return 'synthetic' + ('.' + '.'.join(parts) if parts else '')
+
+
+def _pool_size(rows: int, entropy: float) -> int:
+    return max(1, int(round(rows * entropy)))
+
+
+def _null_mask(rng: np.random.Generator, rows: int, nulls: float):
+    return rng.random(rows) < nulls if nulls > 0 else None
+
+
+def _random_strings(rng: np.random.Generator, count: int, length: int) -> np.ndarray:
+    chars = ALPHABET[rng.integers(0, len(ALPHABET), size=(count, length), dtype=np.uint8)]
+    return chars.view('S{}'.format(length)).ravel().astype('U{}'.format(length))
+
+
+def _floats(rng, rows, spec):
+    pool_size = _pool_size(rows, spec['entropy'])
+    values = rng.standard_normal(pool_size)
+    if pool_size < rows:
+        values = values[rng.integers(0, pool_size, rows)]
+    mask = _null_mask(rng, rows, spec['nulls'])
+    if mask is not None:
+        values[mask] = np.nan
+    return values
+
+
+def _ints(rng, rows, spec):
+    values = rng.integers(0, _pool_size(rows, spec['entropy']), rows, dtype=np.int64)
+    mask = _null_mask(rng, rows, spec['nulls'])
+    if mask is None:
+        return values
+    return pd.arrays.IntegerArray(values, mask)
+
+
+def _vocabulary(rng, spec) -> np.ndarray:
+    return pd.unique(_random_strings(rng, max(spec['cardinality'], 1), spec['string_length']))
+
+
+def category_vocabularies(spec: dict) -> dict:
+    '''
+    Name of categorical column => its categories, drawn once for all chunks of the spec
+    (chunks appended to one file must have the same categories)
+    '''
+    spec = {**DEFAULT_SPEC, **(spec or {})}
+    rng = np.random.default_rng(spec['seed'])
+    return {'{}_{}'.format(COLUMN_PREFIXES['categories'], i): _vocabulary(rng, spec) for i in range(spec['categories'])}
+
+
+def _categories(rng, rows, spec, categories=None):
+    if categories is None:
+        categories = _vocabulary(rng, spec)
+    codes = rng.integers(0, len(categories), rows, dtype=np.int32)
+    mask = _null_mask(rng, rows, spec['nulls'])
+    if mask is not None:
+        codes[mask] = -1
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def _strings(rng, rows, spec):
+    pool_size = _pool_size(rows, spec['entropy'])
+    values = _random_strings(rng, pool_size, spec['string_length'])
+    if pool_size < rows:
+        values = values[rng.integers(0, pool_size, rows)]
+    values = values.astype(object)
+    mask = _null_mask(rng, rows, spec['nulls'])
+    if mask is not None:
+        values[mask] = None
+    return values
+
+
+def generate_dataframe(
+        spec: dict = None, rows: int = None, start_row: int = 0, seed=None, vocabularies: dict = None
+) -> pd.DataFrame:
+    '''
+    DataFrame with shape given by spec (see DEFAULT_SPEC), rows and seed override values of spec,
+    start_row is the position of the first row (for index of chunks),
+    vocabularies - categories of categorical columns (see category_vocabularies), drawn from seed if None
+    '''
+    spec = {**DEFAULT_SPEC, **(spec or {})}
+    rows = spec['rows'] if rows is None else rows
+    rng = np.random.default_rng(spec['seed'] if seed is None else seed)
+    columns = {}
+    for kind, fn in (('floats', _floats), ('ints', _ints), ('categories', _categories), ('strings', _strings)):
+        for i in range(spec[kind]):
+            name = '{}_{}'.format(COLUMN_PREFIXES[kind], i)
+            if kind == 'categories' and vocabularies is not None:
+                columns[name] = fn(rng, rows, spec, vocabularies[name])
+            else:
+                columns[name] = fn(rng, rows, spec)
+    if spec['datetime_index']:
+        start = pd.Timestamp(START_DATETIME) + start_row * pd.tseries.frequencies.to_offset(spec['freq'])
+        index = pd.date_range(start, periods=rows, freq=spec['freq'], name='time')
+    else:
+        index = pd.RangeIndex(start_row, start_row + rows)
+    return pd.DataFrame(columns, index=index)
+
+
+def generate_chunks(spec: dict = None, chunksize: int = 1000000):
+    '''
+    Yield spec['rows'] rows of synthetic data in chunks (DataFrames with chunksize rows),
+    every chunk has its own independent random stream, so the memory is bounded by the chunk size,
+    categorical columns of all chunks have the same categories (drawn once)
+    '''
+    spec = {**DEFAULT_SPEC, **(spec or {})}
+    vocabularies = category_vocabularies(spec)
+    seeds = np.random.SeedSequence(spec['seed']).spawn((spec['rows'] + chunksize - 1) // chunksize)
+    for i, seed in enumerate(seeds):
+        start_row = i * chunksize
+        yield generate_dataframe(
+            spec, rows=min(chunksize, spec['rows'] - start_row), start_row=start_row, seed=seed,
+            vocabularies=vocabularies
+        )
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Ivo Marvan"
+__email__ = "ivo@marvan.cz"
+__description__ = '''
+    Tests of synthetic_data: chunks of one spec can be appended to one file.
+    Run: python -m pytest test_synthetic_data.py (or python test_synthetic_data.py)
+
+    (MIT License)
+'''
+import os
+import sys
+import tempfile
+import unittest
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_data import generate_chunks, parse_spec
+
+try:
+    import tables
+except ImportError:
+    tables = None
+
+
+class TestChunks(unittest.TestCase):
+
+    spec = parse_spec('rows=2500,categories=2,cardinality=20')
+
+    def test_same_categories(self):
+        chunks = list(generate_chunks(self.spec, chunksize=1000))
+        self.assertEqual([len(chunk) for chunk in chunks], [1000, 1000, 500])
+        for name in ('category_0', 'category_1'):
+            first = chunks[0][name].cat.categories
+            for chunk in chunks[1:]:
+                self.assertTrue(chunk[name].cat.categories.equals(first))
+
+    @unittest.skipIf(tables is None, 'PyTables is not installed')
+    def test_hdf_append(self):
+        chunks = generate_chunks(self.spec, chunksize=1000)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'chunks.h5')
+            with pd.HDFStore(filename, mode='w') as store:
+                for chunk in [next(chunks), next(chunks)]:
+                    store.append('data', chunk, format='table')
+            df = pd.read_hdf(filename, 'data')
+        self.assertEqual(len(df), 2000)
+        self.assertEqual(df['category_0'].dtype.name, 'category')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,13 +15,29 @@ __description__ = '''
 '''
 
 import os
+import re
 import sys
+import gzip
+import json
+import time
+import resource
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 import pandas as pd
 import numpy as np
-from timeit import Timer
 from numpy import round, nan, isnan
 from itertools import product
 import argparse
+from functools import partial
+
+from timing import measure, STATS
+from memory_usage import measure_memory_isolated, measure_peak_rss, run_isolated, MEMORY_STATS
+from streaming import stream_descriptions, measure_stream_write, measure_stream_read
+from result_cache import ResultCache, dataset_hash, source_hash
+from synthetic_data import generate_dataframe, generate_chunks, parse_spec, spec_name, DEFAULT_SPEC
+from cpu_affinity import get_available_cpus, get_thread_counts, pin_to_cpu
+from page_cache import evict_from_page_cache
 
 # root of repository in your filesystem
 THIS_FILE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -30,6 +46,14 @@ sys.path.append(THIS_FILE_DIR)
 
 # --- from http://pandas.pydata.org/pandas-docs/stable/io.html#performance-considerations -----------------------------
 import sqlite3
+import mmap
+import pickle
+import struct
+import weakref
+
+
+# counts of threads of multi-threaded variants (*_mt kinds)
+THREAD_COUNTS = get_thread_counts()
 
 # method => variants of parameters
 fn_descriptions = {
@@ -54,9 +78,75 @@ fn_descriptions = {
         'engine' : ['auto', 'pyarrow', 'fastparquet'],
         'compression' : ['snappy', 'gzip', 'brotli', None],
     },
+    # zero-copy / lazy access paths
+    'arrow_ipc': {
+        'memory_map': [False, True]
+    },
+    'npy': {
+        'mmap_mode': [None, 'r']
+    },
+    'pickle_oob': {},
+    'arrow_dtypes': {
+        'format': ['parquet', 'feather']
+    },
+    # multi-threaded encoding/decoding
+    'parquet_mt': {
+        'compression': ['zstd', 'lz4', 'snappy'],
+        'threads': THREAD_COUNTS
+    },
+    'feather_mt': {
+        'compression': ['zstd', 'lz4'],
+        'threads': THREAD_COUNTS
+    },
+    'hdf_mt': {
+        'complib': ['blosc:lz4', 'blosc:zstd'],
+        'complevel': [5],
+        'threads': THREAD_COUNTS
+    },
+    'csv_pgzip': {
+        'threads': THREAD_COUNTS
+    },
 }
 
-# @ todo add to_parquet
+# alignment of out-of-band buffers in files written by test_pickle_oob_write
+OOB_ALIGNMENT = 64
+# names of fields of the structured array written by test_npy_write
+NPY_INDEX_FIELD = '__index__'
+NPY_MASK_SUFFIX = '__isna'
+
+# columns used for ranking of variants (if they are in the result table)
+RANK_COLUMNS = ['write_time', 'read_time', 'cold_read_time', 'size', 'write_rss_peak', 'read_rss_peak']
+# directions with measured memory consumption
+MEMORY_DIRECTIONS = ['write', 'read']
+# formats with subset_read_time / read_time under this value are considered to skip I/O
+SUBSET_PUSHDOWN_RATIO = 0.5
+# memory consumption under this value (bytes) is not distinguished in relative values
+MEMORY_FLOOR = 2**20
+# blocks of rows compressed by one thread of test_csv_pgzip_write (more blocks than threads balance the load)
+PGZIP_BLOCKS_PER_THREAD = 4
+# next count of threads with lower speedup than this is considered as flat part of the scaling curve
+SCALING_MIN_GAIN = 1.1
+# count of threads in id of multi-threaded variants
+THREADS_ID_RE = re.compile(r'\.threads_(\d+)$')
+
+
+def get_directions(cold_cache: bool = False, subset: bool = False) -> list:
+    '''
+    Measured directions, "cold_read" is reading of the file evicted from the page cache,
+    "first_access" is opening of the file and materialisation of the first column only,
+    "subset_read" is reading of a few columns and a range of rows (see make_subset_query)
+    '''
+    directions = ['write', 'read'] + (['cold_read'] if cold_cache else []) + ['first_access']
+    return directions + (['subset_read'] if subset else [])
+
+
+def get_result_columns(cold_cache: bool = False, memory: bool = False, subset: bool = False) -> list:
+    columns = ['id'] + [d + '_' + stat for d in get_directions(cold_cache, subset) for stat in STATS] + ['size']
+    if subset:
+        columns.append('subset_ratio')
+    if memory:
+        columns += [d + '_' + stat for d in MEMORY_DIRECTIONS for stat in MEMORY_STATS]
+    return columns
 
 
 def test_sql_write(df, filename):
@@ -75,7 +165,7 @@ def test_sql_read(filename):
 
 
 def test_hdf_write(df, filename, complib, complevel, format):
-    df.to_hdf(filename, 'test', mode='w', complib=complib, complevel=complevel, format=format)
+    df.to_hdf(filename, key='test', mode='w', complib=complib, complevel=complevel, format=format)
 
 
 def test_hdf_read(filename, complib, complevel, format):
@@ -112,6 +202,425 @@ def test_pickle_write(df, filename, protocol, compression):
 
 def test_pickle_read(filename, protocol, compression):
     return pd.read_pickle(filename, compression=compression)
+
+
+def test_arrow_ipc_write(df, filename, memory_map):
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df)
+    with pa.OSFile(filename, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def test_arrow_ipc_open(filename, memory_map):
+    '''
+    Returns pyarrow Table, with memory_map its buffers point directly to the mapped file (nothing is read yet)
+    '''
+    import pyarrow as pa
+    if memory_map:
+        return pa.ipc.open_file(pa.memory_map(filename, 'r')).read_all()
+    with pa.OSFile(filename, 'rb') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def test_arrow_ipc_read(filename, memory_map):
+    return test_arrow_ipc_open(filename, memory_map).to_pandas()
+
+
+def _npy_column(values) -> (list, dict):
+    '''
+    Fixed-width fields [(suffix of the name, numpy array), ...] of one column and its metadata:
+    numeric columns as they are, categorical columns as codes (categories in metadata),
+    strings as UTF-8 bytes of the longest value and missing values of strings and nullable types as a mask field
+    '''
+    series = pd.Series(values)
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return [('', series.cat.codes.to_numpy())], {'type': 'category', 'categories': series.cat.categories.tolist()}
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+        return [('', series.to_numpy())], {'type': 'numpy'}
+    mask = series.isna().to_numpy()
+    if pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+        # nullable extension types (Int64, Float64, boolean)
+        data = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+        return [('', data), (NPY_MASK_SUFFIX, mask)], {'type': 'masked', 'dtype': str(dtype)}
+    if pd.api.types.is_string_dtype(dtype):
+        data = np.array([value.encode('utf-8') for value in series.where(~mask, '')], dtype=np.bytes_)
+        fields = [('', data)]
+        if mask.any():
+            fields.append((NPY_MASK_SUFFIX, mask))
+        return fields, {'type': 'string', 'dtype': str(dtype)}
+    raise TypeError('npy: unsupported dtype {} of column {}'.format(dtype, series.name))
+
+
+def _npy_values(array: np.ndarray, name: str, meta: dict):
+    '''
+    Values of one column of the structured array (see _npy_column), numeric fields are not copied
+    '''
+    data = array[name]
+    mask_name = name + NPY_MASK_SUFFIX
+    mask = array[mask_name] if mask_name in array.dtype.names else None
+    if meta['type'] == 'category':
+        return pd.Categorical.from_codes(data, categories=meta['categories'])
+    if meta['type'] == 'masked':
+        values = pd.array(data, dtype=meta['dtype'])
+        values[mask] = pd.NA
+        return values
+    if meta['type'] == 'string':
+        values = np.char.decode(data, 'utf-8').astype(object)
+        if mask is not None:
+            values[mask] = None
+        return pd.array(values, dtype=meta['dtype'])
+    return data
+
+
+def test_npy_write(df, filename, mmap_mode):
+    '''
+    All columns as one structured array of fixed-width fields (first columns, then the index),
+    followed by its metadata (types of columns, categories, index) as JSON and its length
+    '''
+    fields = []
+    meta = {'columns': {}, 'index': None, 'range': None}
+    index = df.index
+    if isinstance(index, pd.RangeIndex):
+        meta['range'] = [index.start, index.step, index.name]
+        named_values = list(df.items())
+    else:
+        meta['index'] = index.name
+        named_values = list(df.items()) + [(NPY_INDEX_FIELD, index)]
+    for name, values in named_values:
+        column_fields, meta['columns'][name] = _npy_column(values)
+        fields += [(name + suffix, data) for suffix, data in column_fields]
+    array = np.empty(len(df), dtype=[(name, data.dtype) for name, data in fields])
+    for name, data in fields:
+        array[name] = data
+    meta_bytes = json.dumps(meta, default=str).encode()
+    with open(filename, 'wb') as f:
+        np.save(f, array, allow_pickle=False)
+        f.write(meta_bytes)
+        f.write(struct.pack('<Q', len(meta_bytes)))
+
+
+def test_npy_open(filename, mmap_mode):
+    '''
+    The structured array (memory mapped with mmap_mode), first fields are the first columns
+    '''
+    return np.load(filename, mmap_mode=mmap_mode, allow_pickle=False)
+
+
+def _npy_meta(filename: str) -> dict:
+    with open(filename, 'rb') as f:
+        f.seek(-8, os.SEEK_END)
+        size, = struct.unpack('<Q', f.read(8))
+        f.seek(-8 - size, os.SEEK_END)
+        return json.loads(f.read(size))
+
+
+def _npy_dataframe(array: np.ndarray, meta: dict, columns: list = None, start: int = 0) -> pd.DataFrame:
+    '''
+    DataFrame of rows of the array (start is the position of its first row in the file), all or given columns
+    '''
+    if columns is None:
+        columns = [name for name in meta['columns'] if name != NPY_INDEX_FIELD]
+    data = {name: _npy_values(array, name, meta['columns'][name]) for name in columns}
+    if meta['range'] is not None:
+        range_start, step, index_name = meta['range']
+        first = range_start + start * step
+        index = pd.RangeIndex(first, first + len(array) * step, step, name=index_name)
+    else:
+        index = pd.Index(_npy_values(array, NPY_INDEX_FIELD, meta['columns'][NPY_INDEX_FIELD]), name=meta['index'])
+    return pd.DataFrame(data, index=index)
+
+
+def test_npy_read(filename, mmap_mode):
+    return _npy_dataframe(test_npy_open(filename, mmap_mode), _npy_meta(filename))
+
+
+def test_pickle_oob_write(df, filename):
+    '''
+    Pickle protocol 5 with out-of-band buffers, the file is:
+        <count of buffers><sizes of buffers><size of pickle><pickle><buffers aligned to OOB_ALIGNMENT>
+    '''
+    buffers = []
+    data = pickle.dumps(df, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    with open(filename, 'wb') as f:
+        f.write(struct.pack('<Q', len(raws)))
+        f.write(struct.pack('<{}Q'.format(len(raws)), *[raw.nbytes for raw in raws]))
+        f.write(struct.pack('<Q', len(data)))
+        f.write(data)
+        for raw in raws:
+            f.write(b'\0' * (-f.tell() % OOB_ALIGNMENT))
+            f.write(raw)
+
+
+def _close_when_released(mapped: mmap.mmap, views: list):
+    '''
+    Closes the memory mapped file (unmaps it and closes its file descriptor) as soon as the last of views
+    (buffers of arrays of a DataFrame) is released
+    '''
+    if not views:
+        mapped.close()
+        return
+    remaining = [len(views)]
+
+    def release():
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            try:
+                mapped.close()
+            except BufferError:
+                # an array of the DataFrame is still used elsewhere, the mapping is released with it
+                pass
+
+    for view in views:
+        weakref.finalize(view, release)
+
+
+def test_pickle_oob_read(filename):
+    '''
+    Arrays of the returned DataFrame are not copied, they use the (copy on write) memory mapped file,
+    the mapping (and its file descriptor) is closed as soon as the DataFrame (its last array) is released
+    '''
+    with open(filename, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    view = memoryview(mapped)
+    count, = struct.unpack_from('<Q', view, 0)
+    sizes = struct.unpack_from('<{}Q'.format(count), view, 8)
+    offset = 8 * (count + 1)
+    pickle_size, = struct.unpack_from('<Q', view, offset)
+    offset += 8
+    data = view[offset:offset + pickle_size]
+    offset += pickle_size
+    buffers = []
+    for size in sizes:
+        offset += -offset % OOB_ALIGNMENT
+        buffers.append(view[offset:offset + size])
+        offset += size
+    df = pickle.loads(data, buffers=buffers)
+    data.release()
+    view.release()
+    _close_when_released(mapped, buffers)
+    return df
+
+
+def test_arrow_dtypes_write(df, filename, format):
+    if format == 'parquet':
+        df.to_parquet(filename, engine='pyarrow')
+    else:
+        df.to_feather(filename)
+
+
+def test_arrow_dtypes_read(filename, format):
+    '''
+    Returns DataFrame with pyarrow backed dtypes (no conversion of arrow buffers to numpy)
+    '''
+    if format == 'parquet':
+        return pd.read_parquet(filename, engine='pyarrow', dtype_backend='pyarrow')
+    return pd.read_feather(filename, dtype_backend='pyarrow')
+
+
+@contextmanager
+def arrow_threads(threads: int):
+    '''
+    Size of the pyarrow CPU thread pool is threads inside of the block, yields pyarrow
+    '''
+    import pyarrow as pa
+    previous = pa.cpu_count()
+    pa.set_cpu_count(threads)
+    try:
+        yield pa
+    finally:
+        pa.set_cpu_count(previous)
+
+
+def test_parquet_mt_write(df, filename, compression, threads):
+    import pyarrow.parquet as pq
+    with arrow_threads(threads) as pa:
+        table = pa.Table.from_pandas(df, nthreads=threads)
+        pq.write_table(table, filename, compression=compression)
+
+
+def test_parquet_mt_read(filename, compression, threads):
+    import pyarrow.parquet as pq
+    with arrow_threads(threads):
+        table = pq.read_table(filename, use_threads=threads > 1)
+        return table.to_pandas(use_threads=threads > 1)
+
+
+def test_feather_mt_write(df, filename, compression, threads):
+    # buffers of record batches are compressed in the pyarrow thread pool
+    import pyarrow.feather as feather
+    with arrow_threads(threads) as pa:
+        table = pa.Table.from_pandas(df, nthreads=threads)
+        feather.write_feather(table, filename, compression=compression)
+
+
+def test_feather_mt_read(filename, compression, threads):
+    import pyarrow.feather as feather
+    with arrow_threads(threads):
+        table = feather.read_table(filename, use_threads=threads > 1)
+        return table.to_pandas(use_threads=threads > 1)
+
+
+def test_hdf_mt_write(df, filename, complib, complevel, threads):
+    # max_blosc_threads is a parameter of the opened file (PyTables resets blosc threads on every open)
+    with pd.HDFStore(filename, mode='w', complib=complib, complevel=complevel, max_blosc_threads=threads) as store:
+        store.put('test', df, format='table')
+
+
+def test_hdf_mt_read(filename, complib, complevel, threads):
+    with pd.HDFStore(filename, mode='r', max_blosc_threads=threads) as store:
+        return store['test']
+
+
+def test_csv_pgzip_write(df, filename, threads):
+    '''
+    Parallel gzip (like pigz): blocks of rows are formatted and compressed in threads,
+    the compressed blocks are concatenated to one multi-member gzip file (readable by any gzip reader)
+    '''
+    blocks = np.array_split(np.arange(len(df)), threads * PGZIP_BLOCKS_PER_THREAD)
+
+    def compress(i, rows):
+        return gzip.compress(df.iloc[rows].to_csv(header=(i == 0)).encode('utf-8'))
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        with open(filename, 'wb') as f:
+            for member in executor.map(compress, range(len(blocks)), blocks):
+                f.write(member)
+
+
+def test_csv_pgzip_read(filename, threads):
+    '''
+    gzip stream is decompressed in one thread (as pigz does), csv is parsed by pyarrow in threads
+    '''
+    import pyarrow.csv as pv
+    with arrow_threads(threads) as pa:
+        with pa.input_stream(filename, compression='gzip') as source:
+            table = pv.read_csv(source, read_options=pv.ReadOptions(use_threads=threads > 1))
+        df = table.to_pandas(use_threads=threads > 1)
+    return df.set_index(df.columns[0]).rename_axis(table.column_names[0] or None)
+
+
+def make_subset_query(df: pd.DataFrame, n_columns: int = 3, start: float = 0.25, rows: float = 0.1) -> dict:
+    '''
+    Query for subset_read: first n_columns (numeric columns first) and a range of rows
+    (relative start and count of rows). Rows are given by positions [start, stop)
+    and by values of index [low, high] for formats which filter by index.
+    '''
+    columns = list(df.select_dtypes('number').columns) + list(df.select_dtypes(exclude='number').columns)
+    n_rows = len(df)
+    first = min(int(n_rows * start), max(n_rows - 1, 0))
+    stop = min(first + max(int(n_rows * rows), 1), n_rows)
+    return {
+        'columns': columns[:n_columns],
+        'start': first,
+        'stop': stop,
+        'index_name': df.index.name or 'index',
+        'low': df.index[first],
+        'high': df.index[stop - 1],
+    }
+
+
+def select_subset(data: pd.DataFrame, query: dict) -> pd.DataFrame:
+    '''
+    Subset of already read data (for formats which can not read only a part of the file)
+    '''
+    return data[query['columns']].iloc[query['start']:query['stop']]
+
+
+def _sql_value(value):
+    # pandas stores datetimes to sqlite as text
+    return str(value) if isinstance(value, pd.Timestamp) else value
+
+
+def _hdf_value(value):
+    return '"{}"'.format(value) if isinstance(value, pd.Timestamp) else repr(value)
+
+
+def test_sql_subset_read(filename, query):
+    # to_sql creates an index for the index column
+    index_name = query['index_name']
+    sql = 'select "{}", {} from test_table where "{}" between ? and ?'.format(
+        index_name, ', '.join('"{}"'.format(c) for c in query['columns']), index_name
+    )
+    sql_db = sqlite3.connect(filename)
+    ret = pd.read_sql_query(
+        sql, sql_db, index_col=index_name, params=(_sql_value(query['low']), _sql_value(query['high']))
+    )
+    sql_db.close()
+    return ret
+
+
+def test_hdf_subset_read(filename, complib, complevel, format, query):
+    if format != 'table':
+        # fixed format can not select columns or rows
+        return select_subset(test_hdf_read(filename, complib, complevel, format), query)
+    where = 'index >= {} & index <= {}'.format(_hdf_value(query['low']), _hdf_value(query['high']))
+    return pd.read_hdf(filename, 'test', columns=query['columns'], where=where)
+
+
+def test_csv_subset_read(filename, compression, query):
+    # all lines are still parsed (skipped lines are only tokenized)
+    header = pd.read_csv(filename, index_col=0, compression=compression, nrows=0)
+    usecols = [0] + [list(header.columns).index(c) + 1 for c in query['columns']]
+    return pd.read_csv(
+        filename, index_col=0, compression=compression, usecols=usecols,
+        skiprows=range(1, query['start'] + 1), nrows=query['stop'] - query['start']
+    )
+
+
+def _parquet_row_groups(metadata, start: int, stop: int) -> (list, int):
+    '''
+    Row groups overlapping rows [start, stop) and the position of the first row of the first of them
+    '''
+    row_groups = []
+    first_row = None
+    position = 0
+    for i in range(metadata.num_row_groups):
+        num_rows = metadata.row_group(i).num_rows
+        if position < stop and position + num_rows > start:
+            row_groups.append(i)
+            if first_row is None:
+                first_row = position
+        position += num_rows
+    return row_groups, first_row or 0
+
+
+def test_parquet_subset_read(filename, engine, compression, query):
+    if engine == 'fastparquet':
+        return pd.read_parquet(filename, engine=engine, columns=query['columns']).iloc[query['start']:query['stop']]
+    # pyarrow reads only the selected columns of row groups with the selected rows
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(filename)
+    row_groups, first_row = _parquet_row_groups(parquet_file.metadata, query['start'], query['stop'])
+    table = parquet_file.read_row_groups(row_groups, columns=query['columns'], use_pandas_metadata=False)
+    return table.slice(query['start'] - first_row, query['stop'] - query['start']).to_pandas()
+
+
+def test_feather_subset_read(filename, query):
+    return pd.read_feather(filename, columns=query['columns']).iloc[query['start']:query['stop']]
+
+
+def test_arrow_ipc_subset_read(filename, memory_map, query):
+    table = test_arrow_ipc_open(filename, memory_map).select(query['columns'])
+    return table.slice(query['start'], query['stop'] - query['start']).to_pandas()
+
+
+def test_npy_subset_read(filename, mmap_mode, query):
+    array = test_npy_open(filename, mmap_mode)[query['start']:query['stop']]
+    return _npy_dataframe(array, _npy_meta(filename), query['columns'], start=query['start'])
+
+
+def touch_first_column(data):
+    '''
+    Materialise values of the first column of DataFrame, pyarrow Table or (structured) numpy array
+    '''
+    if isinstance(data, pd.DataFrame):
+        return data.iloc[:, 0].to_numpy(copy=True)
+    if isinstance(data, np.ndarray):
+        return np.array(data[data.dtype.names[0]] if data.dtype.names else data[:, 0])
+    return data.column(0).to_numpy()
 # ----------------------------------------------------------------------------------------------------------------------
 
 
@@ -157,69 +666,451 @@ def get_filename_kind_params_id(outdir:str, fn_descriptions:dict=fn_descriptions
             yield filename, kind, params_str, id_str
 
 
+def measure_variant(
+        df: pd.DataFrame,
+        filename: str,
+        kind: str,
+        params_str: str,
+        id_str: str,
+        number_of_experiments: int = 5,
+        timing_options: dict = None,
+        cold_cache: bool = False,
+        memory: bool = False,
+        subset: bool = False,
+        verbose: bool = True
+) -> dict:
+    '''
+    Measure write time, read time and size of one variant, returns a row for the result table.
+    number_of_experiments is the minimal number of measured calls,
+    timing_options are other parameters of timing.measure (warmup, max_runs, target_rel_error, max_time).
+    With cold_cache the reading is measured also with the file evicted from the page cache before every call.
+    With memory the memory consumption of writing and reading is measured, every call in its own process.
+    With subset the reading of a few columns and rows (see make_subset_query) is measured too.
+    '''
+    row = {'id': id_str}
+    if verbose:
+        print(id_str)
+    namespace = {**globals(), 'df': df, 'filename': filename}
+    if subset:
+        namespace['query'] = make_subset_query(df)
+    calls = {}
+    for direction in get_directions(cold_cache, subset):
+        if verbose:
+            sys.stdout.write('\t' + direction + ':')
+        setup = None
+        if direction == 'write':
+            function_call_str = 'test_' + kind + '_write(df, filename' + params_str + ')'
+        elif direction == 'first_access':
+            # lazy formats have test_*_open, for others the first access means reading of everything
+            open_fn_name = 'test_' + kind + '_open'
+            if open_fn_name not in globals():
+                open_fn_name = 'test_' + kind + '_read'
+            function_call_str = 'touch_first_column(' + open_fn_name + '(filename' + params_str + '))'
+        elif direction == 'subset_read':
+            # formats without test_*_subset_read read everything and select the subset in memory
+            if 'test_' + kind + '_subset_read' in globals():
+                function_call_str = 'test_' + kind + '_subset_read(filename' + params_str + ', query=query)'
+            else:
+                function_call_str = 'select_subset(test_' + kind + '_read(filename' + params_str + '), query)'
+        else:
+            function_call_str = 'test_' + kind + '_read(filename' + params_str + ')'
+            if direction == 'cold_read':
+                setup = lambda: evict_from_page_cache(filename)
+        calls[direction] = partial(eval, compile(function_call_str, id_str, 'eval'), namespace)
+        stats = dict.fromkeys(STATS, nan)
+        try:
+            stats = measure(
+                calls[direction], min_runs=number_of_experiments, setup=setup, **(timing_options or {})
+            )
+        except Exception as e:
+            sys.stderr.write(str(e) + '\n')
+        if verbose:
+            print('{} (min={}, p95={}, runs={})'.format(stats['time'], stats['min'], stats['p95'], stats['runs']))
+        for stat in STATS:
+            row[direction + '_' + stat] = stats[stat]
+    if not isnan(row['read_time']):
+        # reading was sucessful
+        size = get_file_size(filename)
+    else:
+        size = nan
+    row['size'] = size
+    if verbose:
+        print('\tsize:', str(size))
+    if subset:
+        # near 1 means that the whole file is decoded anyway
+        row['subset_ratio'] = row['subset_read_time'] / row['read_time']
+    if memory:
+        for direction in MEMORY_DIRECTIONS:
+            values = dict.fromkeys(MEMORY_STATS, nan)
+            if not isnan(row[direction + '_time']):
+                try:
+                    values = measure_memory_isolated(calls[direction])
+                except Exception as e:
+                    sys.stderr.write(str(e) + '\n')
+            if verbose:
+                print('\t{} memory: {}'.format(direction, values))
+            for stat in MEMORY_STATS:
+                row[direction + '_' + stat] = values[stat]
+    return row
+
+
+def get_cache_settings(variant_options: dict, jobs: int = 1) -> dict:
+    '''
+    Settings which change the measurement, they are a part of the key of the result cache:
+    options of measure_variant (number of experiments, timing, cold cache and memory modes)
+    and the count of parallel processes with pinning to CPUs (contention of workers)
+    '''
+    return dict(
+        variant_options,
+        cold_cache=bool(variant_options.get('cold_cache')),
+        memory=bool(variant_options.get('memory')),
+        jobs=jobs,
+        pinned=jobs > 1 and hasattr(os, 'sched_setaffinity'),
+    )
+
+
+def get_cache_key(cache: ResultCache, id_str: str, kind: str, data_hash: str, settings: dict) -> str:
+    functions = [
+        globals()['test_' + kind + '_' + suffix] for suffix in ['write', 'read', 'open', 'subset_read']
+        if 'test_' + kind + '_' + suffix in globals()
+    ]
+    return cache.get_key(id_str, kind, data_hash, source_hash(*functions), settings)
+
+
 def get_time_size(
         df: pd.DataFrame,
         outdir: str,
         number_of_experiments: int = 5,
-        fn_descriptions: dict=fn_descriptions
+        fn_descriptions: dict=fn_descriptions,
+        timing_options: dict = None,
+        cold_cache: bool = False,
+        memory: bool = False,
+        subset: bool = False,
+        cache: ResultCache = None
 ) -> pd.DataFrame:
-
-    columns = ['id', 'write_time', 'read_time', 'size']
+    '''
+    Measure all variants, with cache only variants without valid stored results are measured
+    '''
+    settings = get_cache_settings(dict(
+        number_of_experiments=number_of_experiments, timing_options=timing_options, cold_cache=cold_cache,
+        memory=memory, subset=subset
+    ))
+    data_hash = dataset_hash(df) if cache is not None else None
     rows = []
-    t = nan
     for filename, kind, params_str, id_str in get_filename_kind_params_id(outdir, fn_descriptions):
-        row = [id_str]
+        key = None
+        if cache is not None:
+            key = get_cache_key(cache, id_str, kind, data_hash, settings)
+            row = cache.get(key)
+            if row is not None:
+                print(id_str, '(cached)')
+                rows.append(row)
+                continue
+        row = measure_variant(
+            df, filename, kind, params_str, id_str, number_of_experiments, timing_options, cold_cache, memory, subset
+        )
+        if cache is not None:
+            cache.put(key, id_str, row)
+        rows.append(row)
+    return pd.DataFrame(data=rows, columns=get_result_columns(cold_cache, memory, subset))
+
+
+# --- parallel execution -----------------------------------------------------------------------------------------------
+# state of one process of the pool (set by _init_worker)
+_worker = {}
+
+
+def _init_worker(counter, df: pd.DataFrame, outdir: str, variant_options: dict):
+    with counter.get_lock():
+        worker_index = counter.value
+        counter.value += 1
+    worker_outdir = os.path.join(outdir, 'worker_{}'.format(worker_index))
+    os.makedirs(worker_outdir, exist_ok=True)
+    _worker.update(
+        index=worker_index,
+        cpu=pin_to_cpu(worker_index),
+        df=df,
+        outdir=worker_outdir,
+        variant_options=variant_options
+    )
+
+
+def _measure_in_worker(position: int, filename: str, kind: str, params_str: str, id_str: str) -> (int, list, dict):
+    # each worker has its own namespace for output files
+    filename = os.path.join(_worker['outdir'], filename)
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+    row = measure_variant(
+        _worker['df'], filename, kind, params_str, id_str, verbose=False, **_worker['variant_options']
+    )
+    wall = time.perf_counter() - wall_before
+    cpu = time.process_time() - cpu_before
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    print('[worker {}, cpu {}] {}'.format(_worker['index'], _worker['cpu'], id_str))
+    stats = {
+        'worker': _worker['index'],
+        'cpu': _worker['cpu'],
+        'variants': 1,
+        'wall_time': wall,
+        'cpu_time': cpu,
+        'voluntary_switches': usage_after.ru_nvcsw - usage_before.ru_nvcsw,
+        'involuntary_switches': usage_after.ru_nivcsw - usage_before.ru_nivcsw,
+    }
+    return position, row, stats
+
+
+def get_time_size_parallel(
+        df: pd.DataFrame,
+        outdir: str,
+        number_of_experiments: int = 5,
+        fn_descriptions: dict=fn_descriptions,
+        timing_options: dict = None,
+        cold_cache: bool = False,
+        memory: bool = False,
+        subset: bool = False,
+        jobs: int = 2,
+        cache: ResultCache = None
+) -> (pd.DataFrame, pd.DataFrame):
+    '''
+    The same as get_time_size, but variants are spread across a pool of "jobs" processes.
+    Every worker is pinned to one CPU and writes to its own subdirectory of outdir.
+    Multi-threaded variants (kinds with parameter threads) are measured after the pool in this process.
+
+    Returns (table with results, table with contention of workers).
+    The contention table shows for every worker cpu_utilization (cpu time / wall time, less than 1 means
+    waiting for disk or for CPU) and count of involuntary context switches (the worker was preempted).
+    '''
+    # file names are relative, workers join them with their own output directory
+    variants = list(get_filename_kind_params_id('', fn_descriptions))
+    variant_options = dict(
+        number_of_experiments=number_of_experiments, timing_options=timing_options, cold_cache=cold_cache,
+        memory=memory, subset=subset
+    )
+    rows = [None] * len(variants)
+    # multi-threaded variants can not run in a process pinned to one CPU,
+    # their single-threaded baseline runs with them (to be comparable)
+    serial = [THREADS_ID_RE.search(id_str) is not None for filename, kind, params_str, id_str in variants]
+    keys = {}
+    if cache is not None:
+        data_hash = dataset_hash(df)
+        for position, (filename, kind, params_str, id_str) in enumerate(variants):
+            # serial variants run alone after the pool, as in get_time_size
+            settings = get_cache_settings(variant_options, jobs=1 if serial[position] else jobs)
+            keys[position] = get_cache_key(cache, id_str, kind, data_hash, settings)
+            rows[position] = cache.get(keys[position])
+            if rows[position] is not None:
+                print(id_str, '(cached)')
+    worker_stats = {}
+    counter = multiprocessing.Value('i', 0)
+    with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(counter, df, outdir, variant_options)
+    ) as executor:
+        futures = [
+            executor.submit(_measure_in_worker, position, *variant) for position, variant in enumerate(variants)
+            if rows[position] is None and not serial[position]
+        ]
+        for future in as_completed(futures):
+            position, row, stats = future.result()
+            rows[position] = row
+            if cache is not None:
+                cache.put(keys[position], row['id'], row)
+            worker = worker_stats.setdefault(stats['worker'], dict.fromkeys(stats, 0))
+            for key, value in stats.items():
+                if key in ('worker', 'cpu'):
+                    worker[key] = value
+                else:
+                    worker[key] += value
+    # multi-threaded variants run one by one after the pool, with all CPUs available
+    for position, (filename, kind, params_str, id_str) in enumerate(variants):
+        if rows[position] is None:
+            rows[position] = measure_variant(
+                df, os.path.join(outdir, filename), kind, params_str, id_str, **variant_options
+            )
+            if cache is not None:
+                cache.put(keys[position], id_str, rows[position])
+    contention = pd.DataFrame(
+        data=sorted(worker_stats.values(), key=lambda w: w['worker']),
+        columns=['worker', 'cpu', 'variants', 'wall_time', 'cpu_time', 'voluntary_switches', 'involuntary_switches']
+    )
+    contention['cpu_utilization'] = round(contention['cpu_time'] / contention['wall_time'], 3)
+    return pd.DataFrame(data=rows, columns=get_result_columns(cold_cache, memory, subset)), contention
+
+
+def print_contention(contention: pd.DataFrame):
+    print('Contention of workers:')
+    print(contention.to_string(index=False))
+# ----------------------------------------------------------------------------------------------------------------------
+
+
+# --- streaming (chunked) writing and reading --------------------------------------------------------------------------
+STREAM_DIRECTIONS = ['write', 'read']
+
+
+def get_stream_variants(outdir: str, stream_descriptions: dict=stream_descriptions) -> (str, str, dict, str):
+    '''
+    Yield (filename, kind, params_dict, id_str)
+    '''
+    params_dicts = (
+        params_dict for params_desr in stream_descriptions.values() for params_dict in get_params_variant(params_desr)
+    )
+    for (filename, kind, params_str, id_str), params_dict in zip(
+            get_filename_kind_params_id(outdir, stream_descriptions), params_dicts
+    ):
+        yield filename + '.stream', kind, params_dict, 'stream.' + id_str
+
+
+def measure_stream_variant(
+        chunk_source,
+        filename: str,
+        kind: str,
+        params: dict,
+        id_str: str,
+        chunksize: int,
+        verbose: bool = True
+) -> dict:
+    '''
+    Measure sustained throughput (rows/s, MB/s of data in memory) and peak RSS of chunked writing and reading.
+    chunk_source() returns a new iterator of chunks (DataFrames) of the input data.
+    Every direction runs in its own process.
+    '''
+    row = {'id': id_str}
+    if verbose:
         print(id_str)
-        for direction in ['write', 'read']:
-            sys.stdout.write('\t' + direction + ':')
-            function_call_str = 'test_' + kind + '_' + direction
-            if direction == 'write':
-                function_call_str += '(df, filename'
-            else:
-                function_call_str += '(filename'
-            function_call_str += params_str + ')'
-            setup = 'filename = "{}"'.format(filename)
-            t = nan
+    values = {}
+    for direction in STREAM_DIRECTIONS:
+        if direction == 'write':
+            fn = lambda: measure_stream_write(chunk_source(), filename, kind, params)
+        else:
+            fn = lambda: measure_stream_read(filename, kind, params, chunksize)
+        failed = bool(values) and isnan(values['time'])
+        values = {'time': nan, 'rows': nan, 'bytes': nan}
+        rss_peak = nan
+        if not failed:
+            # reading only if writing was sucessful
             try:
-                timer = Timer(stmt=function_call_str, setup=setup, globals=globals())
-                t = timer.timeit(number=number_of_experiments)
+                values, rss_peak = run_isolated(partial(measure_peak_rss, fn))
             except Exception as e:
                 sys.stderr.write(str(e) + '\n')
-            except:
-                sys.stderr.write(str(e) + '\n')
-            print(t)
-            row.append(t)
-        if t and not isnan(t):
-            # reading was sucessful
-            size = get_file_size(filename)
-        else:
-            size = nan
-        row.append(size)
-        print('\tsize:', str(size))
-        rows.append(row)
-    return pd.DataFrame(data=rows, columns=columns)
+        row[direction + '_time'] = values['time']
+        row[direction + '_rows_s'] = values['rows'] / values['time']
+        row[direction + '_mb_s'] = values['bytes'] / values['time'] / 2**20
+        row[direction + '_rss_peak'] = rss_peak
+        if verbose:
+            print('\t{}: {} s, {} rows/s, {} MB/s, peak RSS {}'.format(
+                direction, values['time'], row[direction + '_rows_s'], row[direction + '_mb_s'], rss_peak
+            ))
+    row['rows'] = values['rows']
+    row['size'] = get_file_size(filename) if not isnan(values['time']) else nan
+    return row
+
+
+def get_stream_throughput(
+        chunk_source,
+        outdir: str,
+        chunksize: int,
+        stream_descriptions: dict=stream_descriptions
+) -> pd.DataFrame:
+    rows = []
+    for filename, kind, params, id_str in get_stream_variants(outdir, stream_descriptions):
+        rows.append(measure_stream_variant(chunk_source, filename, kind, params, id_str, chunksize))
+    return pd.DataFrame(data=rows)
+
+
+def print_stream_masters(df:pd.DataFrame):
+    for direction in STREAM_DIRECTIONS:
+        c = direction + '_mb_s'
+        print('Master for "{}":\t\t{}'.format(c, list(df[df[c] == df[c].max()]['id'])))
+        c = direction + '_rss_peak'
+        print('Master for "{}":\t{}'.format(c, list(df[df[c] == df[c].min()]['id'])))
+    print('Master for "size":\t\t{}'.format(list(df[df['size'] == df['size'].min()]['id'])))
+# ----------------------------------------------------------------------------------------------------------------------
 
 
 def process_size_time(df:pd.DataFrame)->pd.DataFrame:
     '''
-    Add relative values
+    Add relative values (times are medians of measured runs),
+    variants with the same rel_sum are ranked by p95 of times
     '''
-    for c in ['write_time', 'read_time', 'size']:
-        df['rel_' + c] = round(df[c] / df[c].min(),1)
-    df['rel_sum'] = df['rel_write_time'] + df['rel_read_time'] + df['rel_size']
-    df.sort_values(by='rel_sum', inplace=True)
+    rank_columns = [c for c in RANK_COLUMNS if c in df]
+    for c in rank_columns:
+        values = df[c].clip(lower=MEMORY_FLOOR) if c.endswith('_rss_peak') else df[c]
+        df['rel_' + c] = round(values / values.min(),1)
+    df['rel_sum'] = df[['rel_' + c for c in rank_columns]].sum(axis=1, min_count=len(rank_columns))
+    df.sort_values(by=['rel_sum', 'write_p95', 'read_p95'], inplace=True)
     return df
 
 
+def get_scaling(df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Times of multi-threaded variants by count of threads,
+    speedup against the lowest count of threads (1) and efficiency (speedup / threads)
+    '''
+    rows = []
+    for id_str, write_time, read_time in df[['id', 'write_time', 'read_time']].itertuples(index=False):
+        found = THREADS_ID_RE.search(id_str)
+        if found:
+            rows.append({
+                'variant': id_str[:found.start()], 'threads': int(found.group(1)),
+                'write_time': write_time, 'read_time': read_time
+            })
+    scaling = pd.DataFrame(data=rows, columns=['variant', 'threads', 'write_time', 'read_time'])
+    scaling = scaling.sort_values(by=['variant', 'threads'], ignore_index=True)
+    for direction in ['write', 'read']:
+        c = direction + '_time'
+        scaling[direction + '_speedup'] = round(scaling.groupby('variant')[c].transform('first') / scaling[c], 2)
+        scaling[direction + '_efficiency'] = round(scaling[direction + '_speedup'] / scaling['threads'], 2)
+    return scaling
+
+
+def get_flat_threads(scaling: pd.DataFrame, direction: str) -> int:
+    '''
+    Count of threads of one variant from which the next count does not bring speedup SCALING_MIN_GAIN
+    '''
+    previous_threads, previous_time = None, None
+    for threads, t in zip(scaling['threads'], scaling[direction + '_time']):
+        if previous_time is not None and previous_time / t < SCALING_MIN_GAIN:
+            return previous_threads
+        previous_threads, previous_time = threads, t
+    return previous_threads
+
+
+def print_scaling(scaling: pd.DataFrame):
+    print('Scaling of multi-threaded variants (speedup against 1 thread):')
+    for variant, variant_scaling in scaling.groupby('variant', sort=False):
+        flats = []
+        for direction in ['write', 'read']:
+            threads = get_flat_threads(variant_scaling, direction)
+            speedup = variant_scaling[variant_scaling['threads'] == threads][direction + '_speedup'].iloc[0]
+            flats.append('{} flat from {} threads ({}x)'.format(direction, threads, speedup))
+        print('\t{}:\t{}'.format(variant, ', '.join(flats)))
+
+
 def print_masters(df:pd.DataFrame):
-    for c in ['write_time', 'read_time', 'size']:
+    for c in [c for c in RANK_COLUMNS if c in df]:
         c1 = 'rel_' + c
         print('Master for "{}":\t\t{}'.format(c, list(df[df[c1]==1]['id'])))
+        if c.endswith('_time') and df[c].notna().any():
+            # variants with confidence interval overlapping the interval of the fastest one
+            direction = c[:-len('_time')]
+            best = df.loc[df[c].idxmin()]
+            equal = df[df[direction + '_ci_low'] <= best[direction + '_ci_high']]
+            print('\tstatistically equal (95% CI):\t{}'.format(list(equal['id'])))
+    if df['first_access_time'].notna().any():
+        best = df['first_access_time'].min()
+        print('Master for "first_access_time":\t{}'.format(list(df[df['first_access_time'] == best]['id'])))
+    if 'subset_ratio' in df:
+        pushdown = df[df['subset_ratio'] < SUBSET_PUSHDOWN_RATIO].sort_values(by='subset_ratio')
+        print('Subset read under {} of full read:\t{}'.format(SUBSET_PUSHDOWN_RATIO, list(pushdown['id'])))
     print('Master of compromise:\t\t{}'.format(list(df[df['rel_sum']==df['rel_sum'].min()]['id'])))
 
 
-def read_sample_data(in_filename:str) -> pd.DataFrame:
+def read_sample_data(in_filename:str, synthetic:dict=None) -> pd.DataFrame:
     '''
+    With synthetic (spec of synthetic_data) returns generated data instead of reading of the file.
+
     For different type o data you can change this function.
     For examle:
         df = pd.read_csv(
@@ -236,9 +1127,24 @@ def read_sample_data(in_filename:str) -> pd.DataFrame:
         df = df.astype(np.float64)
         return df
     '''
+    if synthetic is not None:
+        return generate_dataframe(synthetic)
     return pd.read_csv(in_filename, compression='gzip', encoding='utf-8')
 
 
+def read_sample_data_chunks(in_filename:str, chunksize:int, synthetic:dict=None):
+    '''
+    Data yielded in chunks (DataFrames with chunksize rows): the same data as read_sample_data for the CSV input;
+    synthetic data has the same spec and categories, but values of chunks are drawn by their own random streams,
+    so they differ from generate_dataframe(synthetic)
+    '''
+    if synthetic is not None:
+        yield from generate_chunks(synthetic, chunksize)
+        return
+    with pd.read_csv(in_filename, compression='gzip', encoding='utf-8', chunksize=chunksize) as reader:
+        yield from reader
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description=__description__)
 
@@ -272,19 +1178,229 @@ if __name__ == '__main__':
         type=int,
         required=False,
         default=default,
-        help='number of experiments for avarage for one methode (default:' + str(default) + ')'
+        help='minimal number of measured experiments for one methode (default:' + str(default) + ')'
+    )
+
+    default = 1
+    parser.add_argument(
+        '-w', '--warmup',
+        dest='warmup',
+        metavar='<warmup>',
+        type=int,
+        required=False,
+        default=default,
+        help='number of not measured warmup runs for one methode (default:' + str(default) + ')'
+    )
+
+    default = 50
+    parser.add_argument(
+        '-m', '--max_runs',
+        dest='max_runs',
+        metavar='<max_runs>',
+        type=int,
+        required=False,
+        default=default,
+        help='maximal number of measured experiments for one methode (default:' + str(default) + ')'
+    )
+
+    default = 0.05
+    parser.add_argument(
+        '-re', '--rel_error',
+        dest='rel_error',
+        metavar='<rel_error>',
+        type=float,
+        required=False,
+        default=default,
+        help='measuring stops when the 95%% confidence interval of the median is narrower than this relative error '
+             '(default:' + str(default) + ')'
+    )
+
+    default = 60.0
+    parser.add_argument(
+        '-mt', '--max_time',
+        dest='max_time',
+        metavar='<max_time>',
+        type=float,
+        required=False,
+        default=default,
+        help='maximal measured time in seconds for one direction of one methode (default:' + str(default) + ')'
+    )
+
+    default = get_available_cpus()
+    parser.add_argument(
+        '-mth', '--max_threads',
+        dest='max_threads',
+        metavar='<max_threads>',
+        type=int,
+        required=False,
+        default=default,
+        help='maximal count of threads of multi-threaded variants, '
+             'they are measured with powers of 2 up to this count (default:' + str(default) + ')'
+    )
+
+    default = 1
+    parser.add_argument(
+        '-j', '--jobs',
+        dest='jobs',
+        metavar='<jobs>',
+        type=int,
+        required=False,
+        default=default,
+        help='number of parallel processes, every process is pinned to one CPU (default:' + str(default) + ')'
+    )
+
+    parser.add_argument(
+        '-cc', '--cold_cache',
+        dest='cold_cache',
+        action='store_true',
+        help='measure also reading of files evicted from the OS page cache (cold_read_* columns, Linux only)'
+    )
+
+    parser.add_argument(
+        '-mem', '--memory',
+        dest='memory',
+        action='store_true',
+        help='measure peak RSS, peak of Python/NumPy allocations and copied bytes of writing and reading '
+             '(every call in its own process), peak RSS is used in the ranking'
+    )
+
+    parser.add_argument(
+        '-s', '--subset',
+        dest='subset',
+        action='store_true',
+        help='measure also reading of a few columns and a range of rows (projection and predicate pushdown)'
+    )
+
+    parser.add_argument(
+        '-st', '--stream',
+        dest='stream',
+        action='store_true',
+        help='instead of the matrix of methods measure chunked (streaming) writing and reading '
+             '(throughput and peak memory, results in stream_results.csv)'
+    )
+
+    default = 100000
+    parser.add_argument(
+        '-cs', '--chunksize',
+        dest='chunksize',
+        metavar='<chunksize>',
+        type=int,
+        required=False,
+        default=default,
+        help='number of rows in one chunk for --stream (default:' + str(default) + ')'
+    )
+
+    parser.add_argument(
+        '-sy', '--synthetic',
+        dest='synthetic',
+        metavar='<spec>',
+        type=str,
+        action='append',
+        help='use generated data instead of the input file, spec is "key=value,..." with keys ' + str(list(DEFAULT_SPEC))
+             + ' (for example "rows=1e6,strings=2,nulls=0.1,entropy=0.3"), '
+             'repeat the parameter for a sweep over size and shape of data (results of all are in sweep.csv)'
+    )
+
+    parser.add_argument(
+        '-rc', '--result_cache',
+        dest='result_cache',
+        metavar='<result_cache>',
+        type=str,
+        required=False,
+        default=None,
+        help='sqlite file with stored results, variants with a valid stored result are not measured again '
+             '(default: result_cache.sqlite in the output directory)'
+    )
+
+    parser.add_argument(
+        '-nc', '--no_cache',
+        dest='no_cache',
+        action='store_true',
+        help='do not use stored results'
+    )
+
+    parser.add_argument(
+        '-r', '--refresh',
+        dest='refresh',
+        action='store_true',
+        help='measure all variants again and replace stored results'
     )
 
     args = parser.parse_args()
+    if args.cold_cache and not hasattr(os, 'posix_fadvise'):
+        parser.error('--cold_cache needs os.posix_fadvise, which is not available on this platform')
 
-    os.makedirs(args.outdir, exist_ok=True)
-    result_filename = os.path.join(args.outdir, 'results.csv')
-    df = read_sample_data(args.infile)
-    time_size_table = get_time_size(
-        df, number_of_experiments=args.number_of_experiments, outdir=args.outdir, fn_descriptions=fn_descriptions
+    # input data: the file or (for a sweep over size and shape of data) synthetic datasets
+    datasets = [(None, None)]
+    if args.synthetic:
+        datasets = [(spec_name(spec), spec) for spec in (parse_spec(spec_str) for spec_str in args.synthetic)]
+    timing_options = dict(
+        warmup=args.warmup, max_runs=args.max_runs, target_rel_error=args.rel_error, max_time=args.max_time
     )
-    time_size_table = process_size_time(time_size_table)
-    test_csv_write(time_size_table, result_filename)
-    print('-'*80)
-    print_masters(time_size_table)
-    print('-' * 80)
+    thread_counts = get_thread_counts(args.max_threads)
+    fn_descriptions = {
+        kind: {**params_desr, 'threads': thread_counts} if 'threads' in params_desr else params_desr
+        for kind, params_desr in fn_descriptions.items()
+    }
+    cache = None
+    if not args.no_cache:
+        os.makedirs(args.outdir, exist_ok=True)
+        cache = ResultCache(
+            args.result_cache or os.path.join(args.outdir, 'result_cache.sqlite'), refresh=args.refresh
+        )
+    tables = []
+    for dataset, synthetic in datasets:
+        outdir = args.outdir if dataset is None else os.path.join(args.outdir, dataset)
+        os.makedirs(outdir, exist_ok=True)
+        if dataset is not None:
+            print('=' * 80)
+            print('Dataset:', dataset)
+        if args.stream:
+            stream_table = get_stream_throughput(
+                partial(read_sample_data_chunks, args.infile, args.chunksize, synthetic),
+                outdir=outdir, chunksize=args.chunksize
+            )
+            test_csv_write(stream_table, os.path.join(outdir, 'stream_results.csv'))
+            print('-' * 80)
+            print_stream_masters(stream_table)
+            print('-' * 80)
+            tables.append(stream_table.assign(dataset=dataset))
+            continue
+
+        df = read_sample_data(args.infile, synthetic)
+        contention = None
+        if args.jobs > 1:
+            time_size_table, contention = get_time_size_parallel(
+                df, number_of_experiments=args.number_of_experiments, outdir=outdir, fn_descriptions=fn_descriptions,
+                timing_options=timing_options, cold_cache=args.cold_cache,
+                memory=args.memory, subset=args.subset, jobs=args.jobs, cache=cache
+            )
+            test_csv_write(contention, os.path.join(outdir, 'contention.csv'))
+        else:
+            time_size_table = get_time_size(
+                df, number_of_experiments=args.number_of_experiments, outdir=outdir, fn_descriptions=fn_descriptions,
+                timing_options=timing_options, cold_cache=args.cold_cache, memory=args.memory,
+                subset=args.subset, cache=cache
+            )
+        time_size_table = process_size_time(time_size_table)
+        test_csv_write(time_size_table, os.path.join(outdir, 'results.csv'))
+        print('-'*80)
+        print_masters(time_size_table)
+        scaling = get_scaling(time_size_table)
+        if len(scaling):
+            test_csv_write(scaling, os.path.join(outdir, 'scaling.csv'))
+            print('-' * 80)
+            print_scaling(scaling)
+        if contention is not None:
+            print('-' * 80)
+            print_contention(contention)
+        print('-' * 80)
+        tables.append(time_size_table.assign(dataset=dataset))
+
+    if cache is not None:
+        print('Stored results used: {}, measured: {}'.format(cache.hits, cache.misses))
+        cache.close()
+
+    if len(datasets) > 1:
+        # all datasets in one table
+        test_csv_write(pd.concat(tables, ignore_index=True), os.path.join(args.outdir, 'sweep.csv'))
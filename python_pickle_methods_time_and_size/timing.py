@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+__author__ = "Ivo Marvan"
+__email__ = "ivo@marvan.cz"
+__description__ = '''
+    Statistically robust timing of one function call.
+
+    After warmup runs the function is measured repeatedly until the 95% confidence interval of the median
+    is narrower than the target relative error (or the maximal number of runs / time is reached).
+    So cheap and stable methods stop early and noisy methods get more samples.
+
+    The reported time is the median and the interval is distribution free (order statistics): the number
+    of samples below the median is binomial(n, 1/2), so the interval is given by ranks of sorted samples
+    and a few outliers do not widen it. At least 6 samples are needed for the 95% interval.
+
+    (MIT License)
+'''
+
+import math
+import statistics
+from time import perf_counter
+
+CONFIDENCE = 0.95
+
+# names of statistics returned by summarize() (in this order they are added to the result table)
+STATS = ['time', 'min', 'p95', 'std', 'ci_low', 'ci_high', 'runs']
+
+
+def median_ci_ranks(n: int, confidence: float = CONFIDENCE) -> (int, int):
+    '''
+    Indices (low, high) of n sorted samples which bound the confidence interval of the median,
+    None if n samples are too few for the confidence
+    '''
+    alpha = (1 - confidence) / 2
+    below = None
+    cumulative = 0
+    # P(at most k samples below the median) <= alpha, the interval is values[k], values[n - 1 - k]
+    for k in range(n):
+        cumulative += math.comb(n, k)
+        if cumulative / 2 ** n > alpha:
+            break
+        below = k
+    if below is None:
+        return None
+    return below, n - 1 - below
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    '''
+    Percentile (0 <= q <= 100) of sorted values with linear interpolation
+    '''
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(samples: list) -> dict:
+    '''
+    Statistics of measured times, 'time' is the median (robust against outliers),
+    the confidence interval (95%) is for the median too
+    '''
+    values = sorted(samples)
+    n = len(values)
+    median = statistics.median(values)
+    ranks = median_ci_ranks(n)
+    ci_low, ci_high = (-math.inf, math.inf) if ranks is None else (values[ranks[0]], values[ranks[1]])
+    half_width = max(median - ci_low, ci_high - median)
+    return {
+        'time': median,
+        'min': values[0],
+        'p95': percentile(values, 95),
+        'std': statistics.stdev(values) if n > 1 else math.nan,
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'runs': n,
+        'rel_error': half_width / median if median > 0 else math.inf,
+    }
+
+
+def measure(
+        fn,
+        warmup: int = 1,
+        min_runs: int = 5,
+        max_runs: int = 50,
+        target_rel_error: float = 0.05,
+        max_time: float = 60.0,
+        setup=None
+) -> dict:
+    '''
+    Call fn() warmup times without measuring, then measure it at least min_runs times and continue
+    until the relative half width of the confidence interval is at most target_rel_error,
+    max_runs is reached or the measured calls took more than max_time seconds.
+
+    The optional setup() is called (not measured) before every call of fn().
+    Returns summarize() of measured times.
+    '''
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+    samples = []
+    min_runs = max(min_runs, 2)
+    while True:
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        fn()
+        samples.append(perf_counter() - start)
+        if len(samples) < min_runs:
+            continue
+        if len(samples) >= max_runs or sum(samples) >= max_time:
+            break
+        if summarize(samples)['rel_error'] <= target_rel_error:
+            break
+    return summarize(samples)